@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Memo:
     """メモエンティティ
 
@@ -48,7 +48,7 @@ class Memo:
         return self.detail is not None and len(self.detail.strip()) > 0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TagStats:
     """タグ統計情報
 
@@ -7,7 +7,7 @@ from myao2.domain.entities.channel import Channel
 from myao2.domain.entities.user import User
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Message:
     """Message entity.
 
@@ -1,5 +1,6 @@
 """Channel repository protocol."""
 
+from collections.abc import Collection, Sequence
 from typing import Protocol
 
 from myao2.domain.entities import Channel
@@ -22,6 +23,16 @@ class ChannelRepository(Protocol):
         """
         ...
 
+    async def save_many(self, channels: Sequence[Channel]) -> None:
+        """複数のチャンネル情報をまとめて保存する
+
+        既存のチャンネル（同一の channel_id）が存在する場合は更新する。
+
+        Args:
+            channels: 保存するチャンネルのリスト
+        """
+        ...
+
     async def find_all(self) -> list[Channel]:
         """全チャンネルを取得する
 
@@ -51,3 +62,14 @@ class ChannelRepository(Protocol):
             削除が成功したかどうか（存在しなかった場合は False）
         """
         ...
+
+    async def delete_many(self, channel_ids: Collection[str]) -> int:
+        """複数のチャンネルをまとめて削除する
+
+        Args:
+            channel_ids: 削除するチャンネルの ID
+
+        Returns:
+            削除したレコード数
+        """
+        ...
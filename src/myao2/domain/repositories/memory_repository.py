@@ -71,6 +71,24 @@ class MemoryRepository(Protocol):
         """
         ...
 
+    async def pop_by_scope_and_type(
+        self,
+        scope: MemoryScope,
+        scope_id: str,
+        memory_type: MemoryType,
+    ) -> Memory | None:
+        """スコープ、スコープID、タイプで記憶を削除し、削除した記憶を返す
+
+        Args:
+            scope: 記憶のスコープ
+            scope_id: スコープ固有の ID
+            memory_type: 記憶の種類
+
+        Returns:
+            削除した記憶、存在しなかった場合は None
+        """
+        ...
+
     async def delete_by_scope(
         self,
         scope: MemoryScope,
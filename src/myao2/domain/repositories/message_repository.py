@@ -1,5 +1,6 @@
 """Message repository protocol."""
 
+from collections.abc import Sequence
 from datetime import datetime
 from typing import Protocol
 
@@ -27,6 +28,7 @@ class MessageRepository(Protocol):
         self,
         channel_id: str,
         limit: int = 20,
+        before: datetime | None = None,
     ) -> list[Message]:
         """チャンネルのメッセージ履歴を取得する
 
@@ -35,6 +37,8 @@ class MessageRepository(Protocol):
         Args:
             channel_id: チャンネル ID
             limit: 取得する最大件数
+            before: 指定した場合、この時刻より前のメッセージのみを取得する
+                （前ページ最古のメッセージの timestamp を渡すとページ送りになる）
 
         Returns:
             メッセージリスト（新しい順）
@@ -66,6 +70,7 @@ class MessageRepository(Protocol):
         channel_id: str,
         thread_ts: str,
         limit: int = 20,
+        before: datetime | None = None,
     ) -> list[Message]:
         """スレッドのメッセージ履歴を取得する
 
@@ -73,6 +78,8 @@ class MessageRepository(Protocol):
             channel_id: チャンネル ID
             thread_ts: スレッドの親タイムスタンプ
             limit: 取得する最大件数
+            before: 指定した場合、この時刻より前のメッセージのみを取得する
+                （前ページ最古のメッセージの timestamp を渡すとページ送りになる）
 
         Returns:
             メッセージリスト（新しい順）
@@ -91,6 +98,20 @@ class MessageRepository(Protocol):
         """
         ...
 
+    async def find_by_ids(
+        self, message_ids: Sequence[str], channel_id: str
+    ) -> dict[str, Message]:
+        """複数の ID でメッセージをまとめて検索する
+
+        Args:
+            message_ids: メッセージ ID（Slack の ts）のリスト
+            channel_id: チャンネル ID
+
+        Returns:
+            メッセージ ID をキーとするメッセージの辞書（存在しない ID は含まない）
+        """
+        ...
+
     async def delete(self, message_id: str, channel_id: str) -> None:
         """メッセージを削除する
 
@@ -0,0 +1,49 @@
+"""Bulk statement utilities for persistence layer."""
+
+from collections.abc import Callable, Iterator, Sequence
+from typing import TypeVar
+
+from sqlalchemy.dialects.sqlite import Insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+T = TypeVar("T")
+
+# SQLite のバインド変数上限（SQLITE_MAX_VARIABLE_NUMBER の旧既定値）
+SQLITE_MAX_VARIABLES = 999
+
+
+def chunked(items: Sequence[T], width: int) -> Iterator[Sequence[T]]:
+    """1文のバインド変数が上限に収まるよう items を分割する
+
+    Args:
+        items: 分割する要素
+        width: 1要素あたりのバインド変数の数
+
+    Yields:
+        連続する要素のチャンク
+    """
+    size = SQLITE_MAX_VARIABLES // width
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+async def save_in_chunks(
+    session: AsyncSession,
+    statement_factory: Callable[[Sequence[T]], Insert],
+    entities: Sequence[T],
+    width: int,
+) -> None:
+    """複数行 VALUES の INSERT 文をチャンクごとに実行する
+
+    SQLite のバインド変数上限を超えないよう entities を分割し、
+    各チャンクから生成した文を同じセッションで実行する。
+    コミットは呼び出し側で行う。
+
+    Args:
+        session: 実行に使用するセッション
+        statement_factory: チャンクから INSERT 文を生成する関数
+        entities: 保存するエンティティ
+        width: 1行あたりの列数
+    """
+    for chunk in chunked(entities, width):
+        await session.exec(statement_factory(chunk))
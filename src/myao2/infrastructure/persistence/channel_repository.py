@@ -1,13 +1,16 @@
 """SQLite implementation of ChannelRepository."""
 
-from collections.abc import Callable
+from collections.abc import Callable, Collection, Sequence
 from contextlib import AbstractAsyncContextManager
 from datetime import datetime, timezone
+from typing import Any
 
-from sqlmodel import select
+from sqlalchemy.dialects.sqlite import Insert, insert
+from sqlmodel import col, delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities import Channel
+from myao2.infrastructure.persistence.bulk_utils import chunked, save_in_chunks
 from myao2.infrastructure.persistence.models import ChannelModel
 
 
@@ -33,26 +36,33 @@ class SQLiteChannelRepository:
         """チャンネル情報を保存する（upsert）
 
         既存のチャンネルが存在する場合は更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             channel: 保存するチャンネル
         """
         async with self._session_factory() as session:
-            result = await session.exec(
-                select(ChannelModel).where(ChannelModel.channel_id == channel.id)
-            )
-            existing = result.first()
+            await session.exec(self._upsert_statement([channel]))
+            await session.commit()
 
-            if existing:
-                # 更新
-                existing.name = channel.name
-                existing.updated_at = datetime.now(timezone.utc)
-                session.add(existing)
-            else:
-                # 新規作成
-                model = self._to_model(channel)
-                session.add(model)
+    async def save_many(self, channels: Sequence[Channel]) -> None:
+        """複数のチャンネル情報をまとめて保存する（upsert）
+
+        複数行 VALUES の INSERT ... ON CONFLICT DO UPDATE をチャンクに分けて
+        1トランザクションで実行する。
 
+        Args:
+            channels: 保存するチャンネルのリスト
+        """
+        if not channels:
+            return
+        async with self._session_factory() as session:
+            await save_in_chunks(
+                session,
+                self._upsert_statement,
+                channels,
+                len(ChannelModel.model_fields),
+            )
             await session.commit()
 
     async def find_all(self) -> list[Channel]:
@@ -107,6 +117,31 @@ class SQLiteChannelRepository:
                 return True
             return False
 
+    async def delete_many(self, channel_ids: Collection[str]) -> int:
+        """複数のチャンネルをまとめて削除する
+
+        行を読み込まず、IN 句の DELETE 文を1トランザクションで実行する。
+        SQLite のバインド変数上限を超えないようチャンクに分割する。
+
+        Args:
+            channel_ids: 削除するチャンネルの ID
+
+        Returns:
+            削除したレコード数
+        """
+        if not channel_ids:
+            return 0
+        ids = list(channel_ids)
+        deleted = 0
+        async with self._session_factory() as session:
+            for chunk in chunked(ids, width=1):
+                result = await session.exec(
+                    delete(ChannelModel).where(col(ChannelModel.channel_id).in_(chunk))
+                )
+                deleted += result.rowcount
+            await session.commit()
+        return deleted
+
     def _to_entity(self, model: ChannelModel) -> Channel:
         """モデルをエンティティに変換する
 
@@ -121,16 +156,30 @@ class SQLiteChannelRepository:
             name=model.name,
         )
 
-    def _to_model(self, entity: Channel) -> ChannelModel:
-        """エンティティをモデルに変換する
+    def _upsert_statement(self, channels: Sequence[Channel]) -> Insert:
+        """channel_id の衝突時に更新する INSERT 文を生成"""
+        statement = insert(ChannelModel).values(
+            [self._to_row(channel) for channel in channels]
+        )
+        return statement.on_conflict_do_update(
+            index_elements=["channel_id"],
+            set_={
+                "name": statement.excluded.name,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+
+    def _to_row(self, entity: Channel) -> dict[str, Any]:
+        """エンティティを INSERT 用の列値に変換する
 
         Args:
             entity: Channel エンティティ
 
         Returns:
-            ChannelModel インスタンス
+            列名と値の辞書
         """
-        return ChannelModel(
-            channel_id=entity.id,
-            name=entity.name,
-        )
+        return {
+            "channel_id": entity.id,
+            "name": entity.name,
+            "updated_at": datetime.now(timezone.utc),
+        }
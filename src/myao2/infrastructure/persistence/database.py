@@ -3,17 +3,28 @@
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import Connection, event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Import models to register them with SQLModel metadata
 from myao2.infrastructure.persistence import models as _models  # noqa: F401
+from myao2.infrastructure.persistence.migrations.judgment_dedupe_migration import (
+    migrate_judgment_cache_dedupe_top_level,
+)
 from myao2.infrastructure.persistence.migrations.memo_name_migration import (
     migrate_memo_add_name,
 )
+from myao2.infrastructure.persistence.migrations.memory_without_rowid_migration import (
+    migrate_memory_without_rowid,
+)
+from myao2.infrastructure.persistence.migrations.msg_without_rowid_migration import (
+    migrate_message_without_rowid,
+)
 
 
 class DatabaseManager:
@@ -39,6 +50,10 @@ class DatabaseManager:
 
         エンジンは遅延初期化され、キャッシュされる。
         データベースファイルの親ディレクトリが存在しない場合は自動作成する。
+        接続ごとに synchronous 等の PRAGMA を設定し、ファイルDBの場合は
+        WAL モードも有効にする。
+        インメモリDBの場合は StaticPool で単一接続を共有し、
+        セッション間でスキーマとデータが失われないようにする。
 
         Returns:
             AsyncEngine インスタンス
@@ -50,11 +65,18 @@ class DatabaseManager:
         if self._database_path != ":memory:":
             db_path = Path(self._database_path)
             db_path.parent.mkdir(parents=True, exist_ok=True)
-            url = f"sqlite+aiosqlite:///{self._database_path}"
+            self._engine = create_async_engine(
+                f"sqlite+aiosqlite:///{self._database_path}"
+            )
+            event.listen(self._engine.sync_engine, "connect", _enable_wal)
         else:
-            url = "sqlite+aiosqlite:///:memory:"
+            self._engine = create_async_engine(
+                "sqlite+aiosqlite:///:memory:",
+                poolclass=StaticPool,
+                connect_args={"check_same_thread": False},
+            )
+        event.listen(self._engine.sync_engine, "connect", _set_sqlite_pragmas)
 
-        self._engine = create_async_engine(url)
         self._session_factory = async_sessionmaker(
             self._engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -70,10 +92,16 @@ class DatabaseManager:
 
         # Run migrations first
         await migrate_memo_add_name(engine)
+        await migrate_memory_without_rowid(engine)
+        await migrate_message_without_rowid(engine)
+        await migrate_judgment_cache_dedupe_top_level(engine)
 
         # Then create any new tables
         async with engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
+            # create_all skips indexes of tables that already exist,
+            # so add indexes introduced after the table was created
+            await conn.run_sync(_create_missing_indexes)
 
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -114,3 +142,48 @@ class DatabaseManager:
             return True
         except Exception:
             return False
+
+
+def _enable_wal(dbapi_connection: Any, _connection_record: Any) -> None:
+    """ファイル DB への接続時に WAL モードを有効にする
+
+    WAL モードでは読み取りと書き込みが互いをブロックせず、
+    コミットはジャーナルへの追記1回で済む。インメモリDBでは使用できない。
+
+    Args:
+        dbapi_connection: DBAPI コネクション
+        _connection_record: コネクションレコード（未使用）
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    """接続時に共通の PRAGMA を設定する
+
+    synchronous=NORMAL でコミットごとの fsync を省き、一時テーブルと
+    64MB までのページキャッシュをメモリ上に確保する。
+    ロック競合時は busy_timeout の間待機してから失敗させる。
+
+    Args:
+        dbapi_connection: DBAPI コネクション
+        _connection_record: コネクションレコード（未使用）
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """メタデータに定義されていて DB に存在しないインデックスを作成する
+
+    Args:
+        conn: 同期コネクション
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
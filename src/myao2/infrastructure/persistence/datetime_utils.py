@@ -1,6 +1,13 @@
 """Datetime utilities for persistence layer."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Dialect, Integer
+from sqlalchemy.types import TypeDecorator
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 def normalize_to_utc(dt: datetime) -> datetime:
@@ -19,3 +26,30 @@ def normalize_to_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
+
+
+class UnixMicroseconds(TypeDecorator[datetime]):
+    """Store datetimes as INTEGER microseconds since the Unix epoch.
+
+    Integers are stored as compact varints and compared without parsing,
+    unlike the ISO-8601 TEXT written by the default DateTime type.
+    Values are returned as timezone-aware UTC datetimes; TEXT values
+    written before the column switched to INTEGER are still readable.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: datetime | None, dialect: Dialect
+    ) -> int | None:
+        if value is None:
+            return None
+        return (normalize_to_utc(value) - _EPOCH) // _MICROSECOND
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> datetime | None:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return normalize_to_utc(datetime.fromisoformat(value))
+        return _EPOCH + value * _MICROSECOND
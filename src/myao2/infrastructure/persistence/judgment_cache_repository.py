@@ -3,8 +3,10 @@
 from collections.abc import Callable
 from contextlib import AbstractAsyncContextManager
 from datetime import datetime
+from typing import Any
 
-from sqlmodel import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities.judgment_cache import JudgmentCache
@@ -33,30 +35,35 @@ class SQLiteJudgmentCacheRepository:
         """キャッシュを保存（upsert）
 
         channel_id + thread_ts が同じレコードは更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             cache: 保存するキャッシュ
         """
-        async with self._session_factory() as session:
-            # 既存のキャッシュを検索
-            existing = await self._find_model_by_scope(
-                session, cache.channel_id, cache.thread_ts
+        statement = insert(JudgmentCacheModel).values(self._to_row(cache))
+        update_columns = {
+            "should_respond": statement.excluded.should_respond,
+            "confidence": statement.excluded.confidence,
+            "reason": statement.excluded.reason,
+            "latest_message_ts": statement.excluded.latest_message_ts,
+            "next_check_at": statement.excluded.next_check_at,
+            "updated_at": statement.excluded.updated_at,
+        }
+        if cache.thread_ts is None:
+            # トップレベルは部分ユニークインデックス uq_channel_top_level で衝突を検出
+            statement = statement.on_conflict_do_update(
+                index_elements=["channel_id"],
+                index_where=JudgmentCacheModel.thread_ts.is_(None),  # type: ignore[union-attr]
+                set_=update_columns,
+            )
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=["channel_id", "thread_ts"],
+                set_=update_columns,
             )
 
-            if existing:
-                # 更新
-                existing.should_respond = cache.should_respond
-                existing.confidence = cache.confidence
-                existing.reason = cache.reason
-                existing.latest_message_ts = cache.latest_message_ts
-                existing.next_check_at = cache.next_check_at
-                existing.updated_at = cache.updated_at
-                session.add(existing)
-            else:
-                # 新規作成
-                model = self._to_model(cache)
-                session.add(model)
-
+        async with self._session_factory() as session:
+            await session.exec(statement)
             await session.commit()
 
     async def find_by_scope(
@@ -91,18 +98,13 @@ class SQLiteJudgmentCacheRepository:
             削除したレコード数
         """
         async with self._session_factory() as session:
-            statement = select(JudgmentCacheModel).where(
-                JudgmentCacheModel.next_check_at < before  # type: ignore[union-attr]
+            # 行を読み込まず、1つの DELETE 文で削除する
+            statement = delete(JudgmentCacheModel).where(
+                JudgmentCacheModel.next_check_at < before  # type: ignore[arg-type]
             )
             result = await session.exec(statement)
-            expired_models = result.all()
-
-            deleted_count = len(expired_models)
-            for model in expired_models:
-                await session.delete(model)
-
             await session.commit()
-            return deleted_count
+            return result.rowcount
 
     async def delete_by_scope(
         self,
@@ -162,23 +164,23 @@ class SQLiteJudgmentCacheRepository:
             updated_at=normalize_to_utc(model.updated_at),
         )
 
-    def _to_model(self, entity: JudgmentCache) -> JudgmentCacheModel:
-        """エンティティをモデルに変換
+    def _to_row(self, entity: JudgmentCache) -> dict[str, Any]:
+        """エンティティを INSERT 用の列値に変換
 
         Args:
             entity: JudgmentCache エンティティ
 
         Returns:
-            JudgmentCacheModel インスタンス
+            列名と値の辞書
         """
-        return JudgmentCacheModel(
-            channel_id=entity.channel_id,
-            thread_ts=entity.thread_ts,
-            should_respond=entity.should_respond,
-            confidence=entity.confidence,
-            reason=entity.reason,
-            latest_message_ts=entity.latest_message_ts,
-            next_check_at=entity.next_check_at,
-            created_at=entity.created_at,
-            updated_at=entity.updated_at,
-        )
+        return {
+            "channel_id": entity.channel_id,
+            "thread_ts": entity.thread_ts,
+            "should_respond": entity.should_respond,
+            "confidence": entity.confidence,
+            "reason": entity.reason,
+            "latest_message_ts": entity.latest_message_ts,
+            "next_check_at": entity.next_check_at,
+            "created_at": entity.created_at,
+            "updated_at": entity.updated_at,
+        }
@@ -1,17 +1,19 @@
 """SQLite implementation of MemoRepository."""
 
 import json
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from contextlib import AbstractAsyncContextManager
 from datetime import datetime
 from typing import Any, Mapping
 from uuid import UUID
 
 from sqlalchemy import delete, func, text
+from sqlalchemy.dialects.sqlite import Insert, insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities.memo import Memo, TagStats
+from myao2.infrastructure.persistence.bulk_utils import save_in_chunks
 from myao2.infrastructure.persistence.models import MemoModel
 
 
@@ -37,22 +39,30 @@ class SQLiteMemoRepository:
         """メモを保存（upsert）
 
         同じ ID のメモが存在する場合は更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             memo: 保存するメモ
         """
         async with self._session_factory() as session:
-            model = MemoModel(
-                id=str(memo.id),
-                name=memo.name,
-                content=memo.content,
-                priority=memo.priority,
-                tags=memo.tags,
-                detail=memo.detail,
-                created_at=memo.created_at,
-                updated_at=memo.updated_at,
+            await session.exec(self._upsert_statement([memo]))
+            await session.commit()
+
+    async def save_many(self, memos: Sequence[Memo]) -> None:
+        """複数のメモをまとめて保存（upsert）
+
+        複数行 VALUES の INSERT ... ON CONFLICT DO UPDATE をチャンクに分けて
+        1トランザクションで実行する。
+
+        Args:
+            memos: 保存するメモのリスト
+        """
+        if not memos:
+            return
+        async with self._session_factory() as session:
+            await save_in_chunks(
+                session, self._upsert_statement, memos, len(MemoModel.model_fields)
             )
-            await session.merge(model)
             await session.commit()
 
     async def find_by_id(self, memo_id: UUID) -> Memo | None:
@@ -291,6 +301,29 @@ class SQLiteMemoRepository:
                 result = await session.execute(stmt, {"tag": tag})
                 return result.scalar() or 0
 
+    def _upsert_statement(self, memos: Sequence[Memo]) -> Insert:
+        """ID 衝突時に更新する INSERT 文を生成
+
+        Args:
+            memos: 保存するメモのリスト
+
+        Returns:
+            INSERT ... ON CONFLICT DO UPDATE 文
+        """
+        statement = insert(MemoModel).values([self._to_row(memo) for memo in memos])
+        return statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "name": statement.excluded.name,
+                "content": statement.excluded.content,
+                "priority": statement.excluded.priority,
+                "tags": statement.excluded.tags,
+                "detail": statement.excluded.detail,
+                "created_at": statement.excluded.created_at,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+
     @staticmethod
     def _parse_json_field(value: Any) -> list[str]:
         """JSON フィールドをパース
@@ -339,6 +372,26 @@ class SQLiteMemoRepository:
             updated_at=model.updated_at,
         )
 
+    def _to_row(self, entity: Memo) -> dict[str, Any]:
+        """Memo エンティティを INSERT 用の列値に変換
+
+        Args:
+            entity: Memo エンティティ
+
+        Returns:
+            列名と値の辞書
+        """
+        return {
+            "id": str(entity.id),
+            "name": entity.name,
+            "content": entity.content,
+            "priority": entity.priority,
+            "tags": entity.tags,
+            "detail": entity.detail,
+            "created_at": entity.created_at,
+            "updated_at": entity.updated_at,
+        }
+
     def _row_to_entity(self, row: Mapping[str, Any]) -> Memo:
         """SQL結果行を Memo エンティティに変換
 
@@ -1,13 +1,16 @@
 """SQLite implementation of MemoryRepository."""
 
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from contextlib import AbstractAsyncContextManager
+from typing import Any
 
-from sqlmodel import select
+from sqlalchemy import lambda_stmt
+from sqlalchemy.dialects.sqlite import Insert, insert
+from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities.memory import Memory, MemoryScope, MemoryType
-from myao2.infrastructure.persistence.datetime_utils import normalize_to_utc
+from myao2.infrastructure.persistence.bulk_utils import save_in_chunks
 from myao2.infrastructure.persistence.models import MemoryModel
 
 
@@ -29,32 +32,30 @@ class SQLiteMemoryRepository:
         """記憶を保存（upsert）
 
         同じ scope, scope_id, memory_type の記憶が存在する場合は更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             memory: 保存する記憶
         """
         async with self._session_factory() as session:
-            # 既存の記憶を検索
-            stmt = select(MemoryModel).where(
-                MemoryModel.scope == memory.scope.value,
-                MemoryModel.scope_id == memory.scope_id,
-                MemoryModel.memory_type == memory.memory_type.value,
-            )
-            result = await session.exec(stmt)
-            existing = result.first()
-
-            if existing:
-                # 更新
-                existing.content = memory.content
-                existing.updated_at = memory.updated_at
-                existing.source_message_count = memory.source_message_count
-                existing.source_latest_message_ts = memory.source_latest_message_ts
-                session.add(existing)
-            else:
-                # 新規作成
-                model = self._to_model(memory)
-                session.add(model)
+            await session.exec(self._upsert_statement([memory]))
+            await session.commit()
+
+    async def save_many(self, memories: Sequence[Memory]) -> None:
+        """複数の記憶をまとめて保存（upsert）
 
+        複数行 VALUES の INSERT ... ON CONFLICT DO UPDATE をチャンクに分けて
+        1トランザクションで実行する。
+
+        Args:
+            memories: 保存する記憶のリスト
+        """
+        if not memories:
+            return
+        async with self._session_factory() as session:
+            await save_in_chunks(
+                session, self._upsert_statement, memories, len(MemoryModel.model_fields)
+            )
             await session.commit()
 
     async def find_by_scope_and_type(
@@ -73,14 +74,19 @@ class SQLiteMemoryRepository:
         Returns:
             見つかった記憶、または None
         """
+        scope_value, memory_type_value = scope.value, memory_type.value
         async with self._session_factory() as session:
-            stmt = select(MemoryModel).where(
-                MemoryModel.scope == scope.value,
-                MemoryModel.scope_id == scope_id,
-                MemoryModel.memory_type == memory_type.value,
+            # lambda_stmt でステートメント構築をキャッシュし、呼び出しごとの
+            # select ツリー生成とコンパイルキャッシュのキー計算を省く
+            stmt = lambda_stmt(
+                lambda: select(MemoryModel).where(
+                    MemoryModel.scope == scope_value,
+                    MemoryModel.scope_id == scope_id,
+                    MemoryModel.memory_type == memory_type_value,
+                )
             )
             result = await session.exec(stmt)
-            model = result.first()
+            model = result.scalars().first()
             return self._to_entity(model) if model else None
 
     async def find_all_by_scope(
@@ -97,13 +103,16 @@ class SQLiteMemoryRepository:
         Returns:
             該当する記憶のリスト
         """
+        scope_value = scope.value
         async with self._session_factory() as session:
-            stmt = select(MemoryModel).where(
-                MemoryModel.scope == scope.value,
-                MemoryModel.scope_id == scope_id,
+            stmt = lambda_stmt(
+                lambda: select(MemoryModel).where(
+                    MemoryModel.scope == scope_value,
+                    MemoryModel.scope_id == scope_id,
+                )
             )
             result = await session.exec(stmt)
-            models = result.all()
+            models = result.scalars().all()
             return [self._to_entity(m) for m in models]
 
     async def delete_by_scope_and_type(
@@ -119,17 +128,51 @@ class SQLiteMemoryRepository:
             scope_id: スコープ固有の ID
             memory_type: 記憶の種類
         """
+        scope_value, memory_type_value = scope.value, memory_type.value
         async with self._session_factory() as session:
-            stmt = select(MemoryModel).where(
-                MemoryModel.scope == scope.value,
-                MemoryModel.scope_id == scope_id,
-                MemoryModel.memory_type == memory_type.value,
+            stmt = lambda_stmt(
+                lambda: delete(MemoryModel).where(
+                    MemoryModel.scope == scope_value,  # type: ignore[arg-type]
+                    MemoryModel.scope_id == scope_id,  # type: ignore[arg-type]
+                    MemoryModel.memory_type == memory_type_value,  # type: ignore[arg-type]
+                )
+            )
+            await session.exec(stmt)
+            await session.commit()
+
+    async def pop_by_scope_and_type(
+        self,
+        scope: MemoryScope,
+        scope_id: str,
+        memory_type: MemoryType,
+    ) -> Memory | None:
+        """スコープ、スコープID、タイプで記憶を削除し、削除した記憶を返す
+
+        DELETE ... RETURNING により検索と削除を1文で行う。
+
+        Args:
+            scope: 記憶のスコープ
+            scope_id: スコープ固有の ID
+            memory_type: 記憶の種類
+
+        Returns:
+            削除した記憶、存在しなかった場合は None
+        """
+        async with self._session_factory() as session:
+            stmt = (
+                delete(MemoryModel)
+                .where(
+                    MemoryModel.scope == scope.value,  # type: ignore[arg-type]
+                    MemoryModel.scope_id == scope_id,  # type: ignore[arg-type]
+                    MemoryModel.memory_type == memory_type.value,  # type: ignore[arg-type]
+                )
+                .returning(MemoryModel)
             )
             result = await session.exec(stmt)
-            model = result.first()
-            if model:
-                await session.delete(model)
-                await session.commit()
+            model = result.scalars().first()
+            memory = self._to_entity(model) if model else None
+            await session.commit()
+            return memory
 
     async def delete_by_scope(
         self,
@@ -142,30 +185,47 @@ class SQLiteMemoryRepository:
             scope: 記憶のスコープ
             scope_id: スコープ固有の ID
         """
+        scope_value = scope.value
         async with self._session_factory() as session:
-            stmt = select(MemoryModel).where(
-                MemoryModel.scope == scope.value,
-                MemoryModel.scope_id == scope_id,
+            stmt = lambda_stmt(
+                lambda: delete(MemoryModel).where(
+                    MemoryModel.scope == scope_value,  # type: ignore[arg-type]
+                    MemoryModel.scope_id == scope_id,  # type: ignore[arg-type]
+                )
             )
-            result = await session.exec(stmt)
-            models = result.all()
-            for model in models:
-                await session.delete(model)
+            await session.exec(stmt)
             await session.commit()
 
-    def _to_model(self, memory: Memory) -> MemoryModel:
-        """Memory エンティティを MemoryModel に変換"""
-        return MemoryModel(
-            scope=memory.scope.value,
-            scope_id=memory.scope_id,
-            memory_type=memory.memory_type.value,
-            content=memory.content,
-            created_at=memory.created_at,
-            updated_at=memory.updated_at,
-            source_message_count=memory.source_message_count,
-            source_latest_message_ts=memory.source_latest_message_ts,
+    def _upsert_statement(self, memories: Sequence[Memory]) -> Insert:
+        """scope, scope_id, memory_type の衝突時に更新する INSERT 文を生成"""
+        statement = insert(MemoryModel).values(
+            [self._to_row(memory) for memory in memories]
+        )
+        return statement.on_conflict_do_update(
+            index_elements=["scope", "scope_id", "memory_type"],
+            set_={
+                "content": statement.excluded.content,
+                "updated_at": statement.excluded.updated_at,
+                "source_message_count": statement.excluded.source_message_count,
+                "source_latest_message_ts": (
+                    statement.excluded.source_latest_message_ts
+                ),
+            },
         )
 
+    def _to_row(self, memory: Memory) -> dict[str, Any]:
+        """Memory エンティティを INSERT 用の列値に変換"""
+        return {
+            "scope": memory.scope.value,
+            "scope_id": memory.scope_id,
+            "memory_type": memory.memory_type.value,
+            "content": memory.content,
+            "created_at": memory.created_at,
+            "updated_at": memory.updated_at,
+            "source_message_count": memory.source_message_count,
+            "source_latest_message_ts": memory.source_latest_message_ts,
+        }
+
     def _to_entity(self, model: MemoryModel) -> Memory:
         """MemoryModel を Memory エンティティに変換"""
         return Memory(
@@ -173,8 +233,8 @@ class SQLiteMemoryRepository:
             scope_id=model.scope_id,
             memory_type=MemoryType(model.memory_type),
             content=model.content,
-            created_at=normalize_to_utc(model.created_at),
-            updated_at=normalize_to_utc(model.updated_at),
+            created_at=model.created_at,
+            updated_at=model.updated_at,
             source_message_count=model.source_message_count,
             source_latest_message_ts=model.source_latest_message_ts,
         )
@@ -1,17 +1,39 @@
 """SQLite implementation of MessageRepository."""
 
 import json
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from contextlib import AbstractAsyncContextManager
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any
 
+from sqlalchemy import lambda_stmt
+from sqlalchemy.dialects.sqlite import Insert, insert
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities import Channel, Message, User
+from myao2.infrastructure.persistence.bulk_utils import save_in_chunks
 from myao2.infrastructure.persistence.models import MessageModel
 
 
+def _build_upsert() -> Insert:
+    """message_id, channel_id の衝突時に更新する INSERT 文を生成"""
+    statement = insert(MessageModel)
+    return statement.on_conflict_do_update(
+        index_elements=["message_id", "channel_id"],
+        set_={
+            "text": statement.excluded.text,
+            "user_name": statement.excluded.user_name,
+            "mentions": statement.excluded.mentions,
+        },
+    )
+
+
+# save のたびに文を組み立てず、1つの文に行の値をバインドして再利用する
+_UPSERT = _build_upsert()
+
+
 class SQLiteMessageRepository:
     """SQLite 版 MessageRepository 実装
 
@@ -33,37 +55,41 @@ class SQLiteMessageRepository:
     async def save(self, message: Message) -> None:
         """メッセージを保存する（upsert）
 
-        既存のメッセージが存在する場合は更新する。
+        既存のメッセージが存在する場合は本文・ユーザー名・メンションを更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             message: 保存するメッセージ
         """
         async with self._session_factory() as session:
-            result = await session.exec(
-                select(MessageModel).where(
-                    MessageModel.message_id == message.id,
-                    MessageModel.channel_id == message.channel.id,
-                )
-            )
-            existing = result.first()
-
-            if existing:
-                # 更新
-                existing.text = message.text
-                existing.user_name = message.user.name
-                existing.mentions = json.dumps(message.mentions)
-                session.add(existing)
-            else:
-                # 新規作成
-                model = self._to_model(message)
-                session.add(model)
+            await session.exec(_UPSERT, params=self._to_row(message))
+            await session.commit()
+
+    async def save_many(self, messages: Sequence[Message]) -> None:
+        """複数のメッセージをまとめて保存する（upsert）
 
+        複数行 VALUES の INSERT ... ON CONFLICT DO UPDATE をチャンクに分けて
+        1トランザクションで実行する。
+
+        Args:
+            messages: 保存するメッセージのリスト
+        """
+        if not messages:
+            return
+        async with self._session_factory() as session:
+            await save_in_chunks(
+                session,
+                self._upsert_statement,
+                messages,
+                len(MessageModel.model_fields),
+            )
             await session.commit()
 
     async def find_by_channel(
         self,
         channel_id: str,
         limit: int = 20,
+        before: datetime | None = None,
     ) -> list[Message]:
         """チャンネルのメッセージを取得する
 
@@ -73,23 +99,24 @@ class SQLiteMessageRepository:
         Args:
             channel_id: チャンネル ID
             limit: 取得する最大件数
+            before: 指定した場合、この時刻より前のメッセージのみを取得する
 
         Returns:
             メッセージリスト（新しい順）
         """
         async with self._session_factory() as session:
-            statement = (
-                select(MessageModel)
-                .where(
+            # lambda_stmt でステートメント構築をキャッシュし、呼び出しごとの
+            # select ツリー生成を省く（channel_id / limit はバインド変数になる）
+            statement = lambda_stmt(
+                lambda: select(MessageModel).where(
                     MessageModel.channel_id == channel_id,
                     MessageModel.thread_ts.is_(None),  # type: ignore[union-attr]
                 )
-                .order_by(MessageModel.timestamp.desc())  # type: ignore[union-attr]
-                .limit(limit)
             )
+            statement = self._newest_first_page(statement, limit, before)
             result = await session.exec(statement)
-            models = result.all()
-            return [self._to_entity(m) for m in models]
+            models = result.scalars().all()
+            return self._to_entities(models, channel_id)
 
     async def find_by_channel_since(
         self,
@@ -111,25 +138,28 @@ class SQLiteMessageRepository:
             メッセージリスト（新しい順）
         """
         async with self._session_factory() as session:
-            statement = (
-                select(MessageModel)
-                .where(
-                    MessageModel.channel_id == channel_id,
-                    MessageModel.thread_ts.is_(None),  # type: ignore[union-attr]
-                    MessageModel.timestamp > since,  # type: ignore[union-attr]
+            statement = lambda_stmt(
+                lambda: (
+                    select(MessageModel)
+                    .where(
+                        MessageModel.channel_id == channel_id,
+                        MessageModel.thread_ts.is_(None),  # type: ignore[union-attr]
+                        MessageModel.timestamp > since,  # type: ignore[union-attr]
+                    )
+                    .order_by(MessageModel.timestamp.desc())  # type: ignore[union-attr]
+                    .limit(limit)
                 )
-                .order_by(MessageModel.timestamp.desc())  # type: ignore[union-attr]
-                .limit(limit)
             )
             result = await session.exec(statement)
-            models = result.all()
-            return [self._to_entity(m) for m in models]
+            models = result.scalars().all()
+            return self._to_entities(models, channel_id)
 
     async def find_by_thread(
         self,
         channel_id: str,
         thread_ts: str,
         limit: int = 20,
+        before: datetime | None = None,
     ) -> list[Message]:
         """スレッドのメッセージを取得する
 
@@ -140,23 +170,22 @@ class SQLiteMessageRepository:
             channel_id: チャンネル ID
             thread_ts: スレッドの親タイムスタンプ
             limit: 取得する最大件数
+            before: 指定した場合、この時刻より前のメッセージのみを取得する
 
         Returns:
             メッセージリスト（新しい順）
         """
         async with self._session_factory() as session:
-            statement = (
-                select(MessageModel)
-                .where(
+            statement = lambda_stmt(
+                lambda: select(MessageModel).where(
                     MessageModel.channel_id == channel_id,
                     MessageModel.thread_ts == thread_ts,
                 )
-                .order_by(MessageModel.timestamp.desc())  # type: ignore[union-attr]
-                .limit(limit)
             )
+            statement = self._newest_first_page(statement, limit, before)
             result = await session.exec(statement)
-            models = result.all()
-            return [self._to_entity(m) for m in models]
+            models = result.scalars().all()
+            return self._to_entities(models, channel_id)
 
     async def find_by_id(self, message_id: str, channel_id: str) -> Message | None:
         """ID でメッセージを検索する
@@ -169,16 +198,39 @@ class SQLiteMessageRepository:
             メッセージ（存在しない場合は None）
         """
         async with self._session_factory() as session:
-            statement = select(MessageModel).where(
-                MessageModel.message_id == message_id,
-                MessageModel.channel_id == channel_id,
+            result = await session.exec(
+                self._find_by_id_statement(message_id, channel_id)
             )
-            result = await session.exec(statement)
-            model = result.first()
+            model = result.scalars().first()
             if model is None:
                 return None
             return self._to_entity(model)
 
+    async def find_by_ids(
+        self, message_ids: Sequence[str], channel_id: str
+    ) -> dict[str, Message]:
+        """複数の ID でメッセージをまとめて検索する
+
+        WHERE message_id IN (...) の1文で取得する。
+
+        Args:
+            message_ids: メッセージ ID（Slack の ts）のリスト
+            channel_id: チャンネル ID
+
+        Returns:
+            メッセージ ID をキーとするメッセージの辞書（存在しない ID は含まない）
+        """
+        if not message_ids:
+            return {}
+        async with self._session_factory() as session:
+            statement = select(MessageModel).where(
+                MessageModel.channel_id == channel_id,
+                MessageModel.message_id.in_(message_ids),  # type: ignore[attr-defined]
+            )
+            result = await session.exec(statement)
+            messages = self._to_entities(result.all(), channel_id)
+            return {m.id: m for m in messages}
+
     async def delete(self, message_id: str, channel_id: str) -> None:
         """Delete a message.
 
@@ -187,12 +239,10 @@ class SQLiteMessageRepository:
             channel_id: Channel ID
         """
         async with self._session_factory() as session:
-            statement = select(MessageModel).where(
-                MessageModel.message_id == message_id,
-                MessageModel.channel_id == channel_id,
+            result = await session.exec(
+                self._find_by_id_statement(message_id, channel_id)
             )
-            result = await session.exec(statement)
-            model = result.first()
+            model = result.scalars().first()
             if model:
                 await session.delete(model)
                 await session.commit()
@@ -241,13 +291,81 @@ class SQLiteMessageRepository:
             )
             result = await session.exec(statement)
             models = result.all()
-            return [self._to_entity(m) for m in models]
+            return self._to_entities(models, channel_id)
+
+    @staticmethod
+    def _newest_first_page(
+        statement: StatementLambdaElement,
+        limit: int,
+        before: datetime | None,
+    ) -> StatementLambdaElement:
+        """新しい順に limit 件を取得する条件を SELECT 文に追加
+
+        before はキーセットページングのカーソルで、OFFSET と違い前のページを
+        読み飛ばさずにインデックスの途中から走査を始められる。
+
+        Args:
+            statement: 絞り込み済みの SELECT 文
+            limit: 取得する最大件数
+            before: この時刻より前のメッセージのみを取得する（None なら先頭から）
+
+        Returns:
+            ORDER BY / LIMIT を追加した SELECT 文
+        """
+        if before is not None:
+            statement += lambda s: s.where(
+                MessageModel.timestamp < before  # type: ignore[operator]
+            )
+        return statement + (
+            lambda s: s.order_by(
+                MessageModel.timestamp.desc()  # type: ignore[union-attr]
+            ).limit(limit)
+        )
+
+    @staticmethod
+    def _find_by_id_statement(
+        message_id: str, channel_id: str
+    ) -> StatementLambdaElement:
+        """主キー相当の (message_id, channel_id) で1件を引く SELECT 文を生成
+
+        lambda_stmt により SQL のコンパイル結果が再利用される。
+        """
+        return lambda_stmt(
+            lambda: select(MessageModel).where(
+                MessageModel.message_id == message_id,
+                MessageModel.channel_id == channel_id,
+            )
+        )
+
+    def _upsert_statement(self, messages: Sequence[Message]) -> Insert:
+        """複数行 VALUES の upsert 文を生成"""
+        return _UPSERT.values([self._to_row(message) for message in messages])
+
+    def _to_entities(
+        self, models: Sequence[MessageModel], channel_id: str
+    ) -> list[Message]:
+        """同一チャンネルのモデル列をエンティティに変換する
 
-    def _to_entity(self, model: MessageModel) -> Message:
+        Channel は不変なので、1件ずつ生成せず全メッセージで共有する。
+
+        Args:
+            models: MessageModel のリスト（すべて channel_id のもの）
+            channel_id: チャンネル ID
+
+        Returns:
+            Message エンティティのリスト
+        """
+        channel = Channel(id=channel_id, name="")
+        return [self._to_entity(m, channel) for m in models]
+
+    def _to_entity(
+        self, model: MessageModel, channel: Channel | None = None
+    ) -> Message:
         """モデルをエンティティに変換する
 
         Args:
             model: MessageModel インスタンス
+            channel: 共有する Channel（省略時はモデルの channel_id から生成）
 
         Returns:
             Message エンティティ
@@ -257,10 +375,11 @@ class SQLiteMessageRepository:
             name=model.user_name,
             is_bot=model.user_is_bot,
         )
-        channel = Channel(
-            id=model.channel_id,
-            name="",  # チャンネル名は永続化しない
-        )
+        if channel is None:
+            channel = Channel(
+                id=model.channel_id,
+                name="",  # チャンネル名は永続化しない
+            )
         mentions = json.loads(model.mentions) if model.mentions else []
 
         return Message(
@@ -273,23 +392,25 @@ class SQLiteMessageRepository:
             mentions=mentions,
         )
 
-    def _to_model(self, entity: Message) -> MessageModel:
-        """エンティティをモデルに変換する
+    def _to_row(self, entity: Message) -> dict[str, Any]:
+        """エンティティを INSERT 用の列値に変換する
 
         Args:
             entity: Message エンティティ
 
         Returns:
-            MessageModel インスタンス
+            列名と値の辞書
         """
-        return MessageModel(
-            message_id=entity.id,
-            channel_id=entity.channel.id,
-            user_id=entity.user.id,
-            user_name=entity.user.name,
-            user_is_bot=entity.user.is_bot,
-            text=entity.text,
-            timestamp=entity.timestamp,
-            thread_ts=entity.thread_ts,
-            mentions=json.dumps(entity.mentions),
-        )
+        return {
+            "message_id": entity.id,
+            "channel_id": entity.channel.id,
+            "user_id": entity.user.id,
+            "user_name": entity.user.name,
+            "user_is_bot": entity.user.is_bot,
+            "text": entity.text,
+            "timestamp": entity.timestamp,
+            "thread_ts": entity.thread_ts,
+            # メンションなしは列の既定値と同じ空文字にし、JSON 変換を省く
+            "mentions": json.dumps(entity.mentions) if entity.mentions else "",
+            "created_at": datetime.now(timezone.utc),
+        }
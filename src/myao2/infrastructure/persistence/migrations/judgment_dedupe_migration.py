@@ -0,0 +1,62 @@
+"""Migration to dedupe top-level judgment caches."""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_judgment_cache_dedupe_top_level(engine: AsyncEngine) -> None:
+    """トップレベルの応答判定キャッシュの重複を削除するマイグレーション
+
+    旧スキーマの一意制約 uq_channel_thread は thread_ts が NULL の行同士を
+    重複とみなさないため、同じチャンネルのトップレベルのキャッシュが
+    複数存在しうる。部分インデックス uq_channel_top_level の作成が
+    失敗しないよう、チャンネルごとに updated_at が最新の行だけを残す。
+
+    Args:
+        engine: SQLAlchemy AsyncEngine
+    """
+    async with engine.begin() as conn:
+        # 1. judgment_cachesテーブルが存在するか確認
+        result = await conn.execute(
+            text(
+                "SELECT name FROM sqlite_master "
+                "WHERE type='table' AND name='judgment_caches'"
+            )
+        )
+        if result.fetchone() is None:
+            logger.debug("judgment_caches table does not exist, skipping migration")
+            return
+
+        # 2. 部分インデックスが既に作成されているか確認
+        result = await conn.execute(
+            text(
+                "SELECT name FROM sqlite_master "
+                "WHERE type='index' AND name='uq_channel_top_level'"
+            )
+        )
+        if result.fetchone() is not None:
+            logger.debug("uq_channel_top_level already exists, skipping migration")
+            return
+
+        # 3. チャンネルごとに最新のトップレベルのキャッシュ以外を削除
+        result = await conn.execute(
+            text(
+                "DELETE FROM judgment_caches "
+                "WHERE thread_ts IS NULL AND id NOT IN ("
+                "SELECT id FROM ("
+                "SELECT id, ROW_NUMBER() OVER ("
+                "PARTITION BY channel_id ORDER BY updated_at DESC, id DESC"
+                ") AS row_number "
+                "FROM judgment_caches WHERE thread_ts IS NULL"
+                ") WHERE row_number = 1)"
+            )
+        )
+        if result.rowcount:
+            logger.info(
+                f"Judgment cache dedupe migration completed. "
+                f"Removed {result.rowcount} duplicate top-level caches."
+            )
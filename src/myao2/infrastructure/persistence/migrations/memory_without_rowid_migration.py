@@ -0,0 +1,81 @@
+"""Migration to rebuild memories table as a WITHOUT ROWID table."""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_memory_without_rowid(engine: AsyncEngine) -> None:
+    """記憶テーブルを複合主キーの WITHOUT ROWID テーブルに作り直すマイグレーション
+
+    旧テーブルの代理キー id を廃止し、(scope, scope_id, memory_type) を
+    主キーとする。旧テーブルは一意制約 uq_scope_type を持つため、
+    既存のレコードはそのまま移行できる。
+
+    Args:
+        engine: SQLAlchemy AsyncEngine
+    """
+    async with engine.begin() as conn:
+        # 1. memoriesテーブルが存在するか確認
+        result = await conn.execute(
+            text(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='memories'"
+            )
+        )
+        if result.fetchone() is None:
+            logger.debug("memories table does not exist, skipping migration")
+            return
+
+        # 2. id カラムが既に削除されているか確認
+        result = await conn.execute(text("PRAGMA table_info(memories)"))
+        columns = {row[1] for row in result.fetchall()}
+        if "id" not in columns:
+            logger.debug("memories table has no id column, skipping migration")
+            return
+
+        logger.info("Starting memory WITHOUT ROWID migration...")
+
+        # 3. 新しいテーブルを作成してデータを移行
+        await _create_new_table(conn)
+        result = await conn.execute(
+            text(
+                "INSERT INTO memories_new "
+                "(scope, scope_id, memory_type, content, created_at, updated_at, "
+                "source_message_count, source_latest_message_ts) "
+                "SELECT scope, scope_id, memory_type, content, created_at, "
+                "updated_at, source_message_count, source_latest_message_ts "
+                "FROM memories"
+            )
+        )
+        migrated_count = result.rowcount
+
+        # 4. 旧テーブル（とそのインデックス）を削除してリネーム
+        await conn.execute(text("DROP TABLE memories"))
+        await conn.execute(text("ALTER TABLE memories_new RENAME TO memories"))
+
+        logger.info(
+            f"Memory WITHOUT ROWID migration completed. "
+            f"Migrated {migrated_count} memories."
+        )
+
+
+async def _create_new_table(conn) -> None:
+    """新しい memories テーブルを作成する"""
+    await conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS memories_new (
+                scope VARCHAR NOT NULL,
+                scope_id VARCHAR NOT NULL,
+                memory_type VARCHAR NOT NULL,
+                content VARCHAR NOT NULL,
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL,
+                source_message_count INTEGER NOT NULL,
+                source_latest_message_ts VARCHAR,
+                PRIMARY KEY (scope, scope_id, memory_type)
+            ) WITHOUT ROWID
+        """)
+    )
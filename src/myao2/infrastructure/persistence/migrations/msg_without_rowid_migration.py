@@ -0,0 +1,84 @@
+"""Migration to rebuild messages table as a WITHOUT ROWID table."""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_message_without_rowid(engine: AsyncEngine) -> None:
+    """メッセージテーブルを複合主キーの WITHOUT ROWID テーブルに作り直すマイグレーション
+
+    旧テーブルの代理キー id を廃止し、(message_id, channel_id) を
+    主キーとする。旧テーブルは一意制約 uq_message_channel を持つため、
+    既存のレコードはそのまま移行できる。
+    インデックスは旧テーブルと共に削除され、create_tables で作り直される。
+
+    Args:
+        engine: SQLAlchemy AsyncEngine
+    """
+    async with engine.begin() as conn:
+        # 1. messagesテーブルが存在するか確認
+        result = await conn.execute(
+            text(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='messages'"
+            )
+        )
+        if result.fetchone() is None:
+            logger.debug("messages table does not exist, skipping migration")
+            return
+
+        # 2. id カラムが既に削除されているか確認
+        result = await conn.execute(text("PRAGMA table_info(messages)"))
+        columns = {row[1] for row in result.fetchall()}
+        if "id" not in columns:
+            logger.debug("messages table has no id column, skipping migration")
+            return
+
+        logger.info("Starting message WITHOUT ROWID migration...")
+
+        # 3. 新しいテーブルを作成してデータを移行
+        await _create_new_table(conn)
+        result = await conn.execute(
+            text(
+                "INSERT INTO messages_new "
+                "(message_id, channel_id, user_id, user_name, user_is_bot, text, "
+                "timestamp, thread_ts, mentions, created_at) "
+                "SELECT message_id, channel_id, user_id, user_name, user_is_bot, "
+                "text, timestamp, thread_ts, mentions, created_at "
+                "FROM messages"
+            )
+        )
+        migrated_count = result.rowcount
+
+        # 4. 旧テーブル（とそのインデックス）を削除してリネーム
+        await conn.execute(text("DROP TABLE messages"))
+        await conn.execute(text("ALTER TABLE messages_new RENAME TO messages"))
+
+        logger.info(
+            f"Message WITHOUT ROWID migration completed. "
+            f"Migrated {migrated_count} messages."
+        )
+
+
+async def _create_new_table(conn) -> None:
+    """新しい messages テーブルを作成する"""
+    await conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS messages_new (
+                message_id VARCHAR NOT NULL,
+                channel_id VARCHAR NOT NULL,
+                user_id VARCHAR NOT NULL,
+                user_name VARCHAR NOT NULL,
+                user_is_bot BOOLEAN NOT NULL,
+                text VARCHAR NOT NULL,
+                timestamp DATETIME NOT NULL,
+                thread_ts VARCHAR,
+                mentions VARCHAR NOT NULL,
+                created_at DATETIME NOT NULL,
+                PRIMARY KEY (message_id, channel_id)
+            ) WITHOUT ROWID
+        """)
+    )
@@ -2,18 +2,19 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, UniqueConstraint
+from sqlalchemy import JSON, Index, UniqueConstraint, text
 from sqlmodel import Field, SQLModel
 
+from myao2.infrastructure.persistence.datetime_utils import UnixMicroseconds
+
 
 class MessageModel(SQLModel, table=True):
     """メッセージテーブル"""
 
     __tablename__ = "messages"
 
-    id: int | None = Field(default=None, primary_key=True)
-    message_id: str = Field(index=True)
-    channel_id: str = Field(index=True)
+    message_id: str = Field(primary_key=True)
+    channel_id: str = Field(primary_key=True)
     user_id: str
     user_name: str
     user_is_bot: bool = False
@@ -24,7 +25,11 @@ class MessageModel(SQLModel, table=True):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     __table_args__ = (
-        UniqueConstraint("message_id", "channel_id", name="uq_message_channel"),
+        # find_by_channel / find_by_thread の絞り込みと並び替えを1つの索引で処理する
+        Index("ix_msg_channel_thread_ts", "channel_id", "thread_ts", "timestamp"),
+        # (message_id, channel_id) を主キーとする WITHOUT ROWID テーブルにし、
+        # find_by_id や upsert の衝突判定を主キー B-tree の1回の探索で済ませる
+        {"sqlite_with_rowid": False},
     )
 
 
@@ -69,6 +74,14 @@ class JudgmentCacheModel(SQLModel, table=True):
 
     __table_args__ = (
         UniqueConstraint("channel_id", "thread_ts", name="uq_channel_thread"),
+        # SQLite の UNIQUE 制約では NULL 同士が重複とみなされないため、
+        # トップレベル（thread_ts が NULL）のキャッシュは部分インデックスで一意にする
+        Index(
+            "uq_channel_top_level",
+            "channel_id",
+            unique=True,
+            sqlite_where=text("thread_ts IS NULL"),
+        ),
     )
 
 
@@ -77,19 +90,18 @@ class MemoryModel(SQLModel, table=True):
 
     __tablename__ = "memories"
 
-    id: int | None = Field(default=None, primary_key=True)
-    scope: str = Field(index=True)
-    scope_id: str = Field(index=True)
-    memory_type: str = Field(index=True)
+    scope: str = Field(primary_key=True)
+    scope_id: str = Field(primary_key=True)
+    memory_type: str = Field(primary_key=True)
     content: str
-    created_at: datetime
-    updated_at: datetime
+    created_at: datetime = Field(sa_type=UnixMicroseconds)
+    updated_at: datetime = Field(sa_type=UnixMicroseconds)
     source_message_count: int
     source_latest_message_ts: str | None = None
 
-    __table_args__ = (
-        UniqueConstraint("scope", "scope_id", "memory_type", name="uq_scope_type"),
-    )
+    # (scope, scope_id, memory_type) を主キーとする WITHOUT ROWID テーブルにし、
+    # 検索・upsert の衝突判定を主キー B-tree の1回の探索で済ませる
+    __table_args__ = {"sqlite_with_rowid": False}
 
 
 class MemoModel(SQLModel, table=True):
@@ -105,3 +117,8 @@ class MemoModel(SQLModel, table=True):
     detail: str | None = Field(default=None)
     created_at: datetime
     updated_at: datetime = Field(index=True)
+
+    __table_args__ = (
+        # find_all / find_by_priority_gte の優先度・更新日時順の並び替えを索引で処理する
+        Index("ix_memo_priority_updated", "priority", "updated_at"),
+    )
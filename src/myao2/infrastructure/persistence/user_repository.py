@@ -1,13 +1,17 @@
 """SQLite implementation of UserRepository."""
 
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from contextlib import AbstractAsyncContextManager
 from datetime import datetime, timezone
+from typing import Any
 
+from sqlalchemy import lambda_stmt
+from sqlalchemy.dialects.sqlite import Insert, insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities import User
+from myao2.infrastructure.persistence.bulk_utils import save_in_chunks
 from myao2.infrastructure.persistence.models import UserModel
 
 
@@ -33,27 +37,30 @@ class SQLiteUserRepository:
         """ユーザー情報を保存する（upsert）
 
         既存のユーザーが存在する場合は更新する。
+        INSERT ... ON CONFLICT DO UPDATE により1文で処理する。
 
         Args:
             user: 保存するユーザー
         """
         async with self._session_factory() as session:
-            result = await session.exec(
-                select(UserModel).where(UserModel.user_id == user.id)
-            )
-            existing = result.first()
-
-            if existing:
-                # 更新
-                existing.name = user.name
-                existing.is_bot = user.is_bot
-                existing.updated_at = datetime.now(timezone.utc)
-                session.add(existing)
-            else:
-                # 新規作成
-                model = self._to_model(user)
-                session.add(model)
+            await session.exec(self._upsert_statement([user]))
+            await session.commit()
+
+    async def save_many(self, users: Sequence[User]) -> None:
+        """複数のユーザー情報をまとめて保存する（upsert）
 
+        複数行 VALUES の INSERT ... ON CONFLICT DO UPDATE をチャンクに分けて
+        1トランザクションで実行する。
+
+        Args:
+            users: 保存するユーザーのリスト
+        """
+        if not users:
+            return
+        async with self._session_factory() as session:
+            await save_in_chunks(
+                session, self._upsert_statement, users, len(UserModel.model_fields)
+            )
             await session.commit()
 
     async def find_by_id(self, user_id: str) -> User | None:
@@ -66,9 +73,11 @@ class SQLiteUserRepository:
             ユーザー（存在しない場合は None）
         """
         async with self._session_factory() as session:
-            statement = select(UserModel).where(UserModel.user_id == user_id)
+            statement = lambda_stmt(
+                lambda: select(UserModel).where(UserModel.user_id == user_id)
+            )
             result = await session.exec(statement)
-            model = result.first()
+            model = result.scalars().first()
             if model is None:
                 return None
             return self._to_entity(model)
@@ -88,17 +97,30 @@ class SQLiteUserRepository:
             is_bot=model.is_bot,
         )
 
-    def _to_model(self, entity: User) -> UserModel:
-        """エンティティをモデルに変換する
+    def _upsert_statement(self, users: Sequence[User]) -> Insert:
+        """user_id の衝突時に更新する INSERT 文を生成"""
+        statement = insert(UserModel).values([self._to_row(user) for user in users])
+        return statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "name": statement.excluded.name,
+                "is_bot": statement.excluded.is_bot,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+
+    def _to_row(self, entity: User) -> dict[str, Any]:
+        """エンティティを INSERT 用の列値に変換する
 
         Args:
             entity: User エンティティ
 
         Returns:
-            UserModel インスタンス
+            列名と値の辞書
         """
-        return UserModel(
-            user_id=entity.id,
-            name=entity.name,
-            is_bot=entity.is_bot,
-        )
+        return {
+            "user_id": entity.id,
+            "name": entity.name,
+            "is_bot": entity.is_bot,
+            "updated_at": datetime.now(timezone.utc),
+        }
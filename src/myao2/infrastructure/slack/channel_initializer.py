@@ -1,6 +1,8 @@
 """Slack channel initializer for syncing channels at startup."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
 
 from slack_sdk.web.async_client import AsyncWebClient
 
@@ -18,6 +20,9 @@ class SlackChannelInitializer:
     DB has current channel information.
     """
 
+    # Maximum page size accepted by users.conversations
+    PAGE_SIZE = 1000
+
     def __init__(
         self,
         client: AsyncWebClient,
@@ -35,72 +40,65 @@ class SlackChannelInitializer:
     async def sync_channels(self) -> list[Channel]:
         """Sync channels from Slack API to database.
 
-        Fetches all channels the bot has joined (public and private)
-        and saves them to the database.
+        Fetches all channels the bot has joined (public and private),
+        across every page of results, and saves them to the database.
+        Each page is saved as soon as it arrives, so pages synced before
+        a failure are kept.
 
         Returns:
-            List of synced channels. Empty list if API call fails.
+            List of synced channels. Only the pages saved before the
+            failure if an API call fails partway.
         """
+        channels: list[Channel] = []
         try:
-            response = await self._client.users_conversations(
-                types="public_channel,private_channel"
+            async for page in self._iter_channel_pages():
+                if page:
+                    await self._channel_repository.save_many(page)
+                    channels.extend(page)
+        except Exception as e:
+            logger.warning(
+                "Failed to sync channels from Slack after %d channels: %s",
+                len(channels),
+                e,
             )
-            channel_data_list = response.get("channels", [])
-
-            channels: list[Channel] = []
-            for channel_data in channel_data_list:
-                channel = Channel(
-                    id=channel_data["id"],
-                    name=channel_data["name"],
-                )
-                await self._channel_repository.save(channel)
-                channels.append(channel)
-
-            logger.info("Synced %d channels from Slack", len(channels))
             return channels
 
-        except Exception as e:
-            logger.warning("Failed to sync channels from Slack: %s", e)
-            return []
+        logger.info("Synced %d channels from Slack", len(channels))
+        return channels
 
     async def sync_channels_with_cleanup(self) -> tuple[list[Channel], list[str]]:
         """Sync channels from Slack API to database with cleanup.
 
-        Fetches all channels the bot has joined, saves them to the database,
-        and removes channels that the bot is no longer in.
+        Fetches all channels the bot has joined, saves new or renamed ones
+        to the database, and removes channels that the bot is no longer in.
 
         Returns:
             Tuple of (synced channels, removed channel IDs).
             Empty lists if API call fails.
         """
         try:
-            response = await self._client.users_conversations(
-                types="public_channel,private_channel"
+            # The Slack API call and the DB read are independent, so overlap them
+            channels, existing_channels = await asyncio.gather(
+                self._fetch_channels(),
+                self._channel_repository.find_all(),
             )
-            channel_data_list = response.get("channels", [])
 
             # Get current channel IDs from Slack
-            slack_channel_ids = {ch["id"] for ch in channel_data_list}
-
-            # Get existing channel IDs from DB
-            existing_channels = await self._channel_repository.find_all()
-            existing_channel_ids = {ch.id for ch in existing_channels}
-
-            # Save/update channels from Slack
-            channels: list[Channel] = []
-            for channel_data in channel_data_list:
-                channel = Channel(
-                    id=channel_data["id"],
-                    name=channel_data["name"],
-                )
-                await self._channel_repository.save(channel)
-                channels.append(channel)
-
-            # Remove channels that are no longer in Slack
-            removed_ids: list[str] = []
-            for channel_id in existing_channel_ids - slack_channel_ids:
-                await self._channel_repository.delete(channel_id)
-                removed_ids.append(channel_id)
+            slack_channel_ids = {ch.id for ch in channels}
+
+            # Get existing channel names from DB, keyed by ID
+            existing_names = {ch.id: ch.name for ch in existing_channels}
+            existing_channel_ids = existing_names.keys()
+
+            # Only new or renamed channels need to be written
+            changed = [ch for ch in channels if existing_names.get(ch.id) != ch.name]
+            if changed:
+                await self._channel_repository.save_many(changed)
+
+            # Remove channels that are no longer in Slack in one statement
+            removed_ids = list(existing_channel_ids - slack_channel_ids)
+            if removed_ids:
+                await self._channel_repository.delete_many(removed_ids)
 
             logger.info(
                 "Synced %d channels, removed %d channels",
@@ -113,6 +111,38 @@ class SlackChannelInitializer:
             logger.warning("Failed to sync channels with cleanup: %s", e)
             return [], []
 
+    async def _fetch_channels(self) -> list[Channel]:
+        """Fetch every channel the bot has joined, following pagination.
+
+        Returns:
+            List of channels across all pages.
+        """
+        return [
+            channel async for page in self._iter_channel_pages() for channel in page
+        ]
+
+    async def _iter_channel_pages(self) -> AsyncIterator[list[Channel]]:
+        """Yield joined channels one users.conversations page at a time.
+
+        Yields:
+            Channels in the current page.
+        """
+        cursor = ""
+        while True:
+            kwargs = {"cursor": cursor} if cursor else {}
+            response = await self._client.users_conversations(
+                types="public_channel,private_channel",
+                limit=self.PAGE_SIZE,
+                **kwargs,
+            )
+            yield [
+                Channel(id=channel_data["id"], name=channel_data["name"])
+                for channel_data in response.get("channels", [])
+            ]
+            cursor = (response.get("response_metadata") or {}).get("next_cursor", "")
+            if not cursor:
+                return
+
     # Implement ChannelSyncService protocol
     async def sync_with_cleanup(self) -> tuple[list[Channel], list[str]]:
         """Alias for sync_channels_with_cleanup.
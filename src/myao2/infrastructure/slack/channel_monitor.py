@@ -1,9 +1,12 @@
 """Slack channel monitor implementation."""
 
+import asyncio
 import logging
 import re
+import time
 from datetime import datetime, timezone
 
+from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
 from myao2.domain.entities import Channel, Message, User
@@ -28,11 +31,16 @@ class SlackChannelMonitor:
         }
     )
 
+    # Maximum concurrent conversations.replies calls, to stay within rate limits
+    MAX_CONCURRENT_REPLIES = 8
+
     def __init__(
         self,
         client: AsyncWebClient,
         bot_user_id: str,
         message_limit: int = 20,
+        user_cache_ttl: float = 600.0,
+        channels_cache_ttl: float = 600.0,
     ) -> None:
         """Initialize the monitor.
 
@@ -40,33 +48,57 @@ class SlackChannelMonitor:
             client: Slack AsyncWebClient.
             bot_user_id: Bot's user ID.
             message_limit: Maximum number of messages to fetch.
+            user_cache_ttl: Seconds to keep users.info results cached.
+            channels_cache_ttl: Seconds to keep the joined channel list cached.
         """
         self._client = client
         self._bot_user_id = bot_user_id
         self._message_limit = message_limit
+        self._user_cache_ttl = user_cache_ttl
+        # user_id -> (cached_at, User), checked against time.monotonic()
+        self._user_cache: dict[str, tuple[float, User]] = {}
+        self._channels_cache_ttl = channels_cache_ttl
+        # (cached_at, channels), checked against time.monotonic()
+        self._channels_cache: tuple[float, list[Channel]] | None = None
+        self._channels_lock = asyncio.Lock()
+        self._replies_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REPLIES)
 
     async def get_channels(self) -> list[Channel]:
         """Get channels the bot has joined.
 
+        The list rarely changes, so it is cached for channels_cache_ttl
+        seconds. Concurrent callers on a miss share a single API call.
+
         Returns:
             List of channels.
         """
-        try:
-            response = await self._client.users_conversations(
-                types="public_channel,private_channel",
-            )
-            channels = []
-            for channel_data in response.get("channels", []):
-                channels.append(
-                    Channel(
-                        id=channel_data["id"],
-                        name=channel_data["name"],
-                    )
+        async with self._channels_lock:
+            cached = self._channels_cache
+            if (
+                cached is not None
+                and time.monotonic() - cached[0] < self._channels_cache_ttl
+            ):
+                return list(cached[1])
+
+            try:
+                response = await self._client.users_conversations(
+                    types="public_channel,private_channel",
                 )
-            return channels
-        except Exception as e:
-            logger.warning(f"Failed to get channels: {e}")
-            return []
+            except Exception as e:
+                self._channels_cache = None
+                logger.warning(f"Failed to get channels: {e}")
+                return []
+
+            channels = [
+                Channel(id=channel_data["id"], name=channel_data["name"])
+                for channel_data in response.get("channels", [])
+            ]
+            self._channels_cache = (time.monotonic(), channels)
+            return list(channels)
+
+    def invalidate_channels_cache(self) -> None:
+        """Drop the cached channel list so the next call refetches it."""
+        self._channels_cache = None
 
     async def get_recent_messages(
         self,
@@ -90,21 +122,24 @@ class SlackChannelMonitor:
                 limit=limit,
             )
 
-            messages = []
-            for msg in response.get("messages", []):
-                if msg.get("subtype") in self.EXCLUDED_SUBTYPES:
-                    continue
+            # Compare raw epoch floats so filtered-out messages are never
+            # converted (which would also cost a users.info lookup)
+            since_ts = since.timestamp() if since is not None else None
 
-                message = await self._to_message(msg, channel_id)
-
-                # Filter by since if specified
-                if since is not None and message.timestamp <= since:
-                    continue
-
-                messages.append(message)
+            # Parse each ts once and reuse it for the filter and the entity
+            parsed = [
+                (float(msg["ts"]), msg)
+                for msg in response.get("messages", [])
+                if msg.get("subtype") not in self.EXCLUDED_SUBTYPES
+            ]
 
             # API returns newest first, keep that order
-            return messages
+            return [
+                await self._to_message(msg, channel_id, ts)
+                for ts, msg in parsed
+                # Filter by since if specified
+                if since_ts is None or ts > since_ts
+            ]
 
         except Exception as e:
             logger.warning(f"Failed to get messages from channel {channel_id}: {e}")
@@ -151,29 +186,28 @@ class SlackChannelMonitor:
                 else 0
             )
 
-            # Convert all messages and build context
-            all_messages: list[Message] = []
-            for msg in raw_messages:
-                if msg.get("subtype") in self.EXCLUDED_SUBTYPES:
-                    continue
-                message = await self._to_message(msg, channel_id)
-                all_messages.append(message)
-
-            # Find bot messages for quick lookup
+            # Only ts, user and thread_ts are needed here, so work on the raw
+            # payload and never resolve authors through users.info
             bot_message_times: list[float] = []
-            for msg in all_messages:
-                if msg.user.id == self._bot_user_id:
-                    bot_message_times.append(msg.timestamp.timestamp())
-
             # Use set to avoid duplicates
             unreplied_threads: set[str | None] = set()
+            # Latest candidate message per thread whose replies need fetching.
+            # A thread is unreplied iff the bot has not replied after its
+            # latest candidate, so each thread is fetched only once.
+            thread_candidates: dict[str, float] = {}
+            # Top-level messages that need a later bot message to count as replied
+            channel_candidates: list[float] = []
 
-            for msg in all_messages:
-                # Skip if bot's own message
-                if msg.user.id == self._bot_user_id:
+            for msg in raw_messages:
+                if msg.get("subtype") in self.EXCLUDED_SUBTYPES:
                     continue
 
-                msg_ts = msg.timestamp.timestamp()
+                msg_ts = float(msg["ts"])
+
+                # Bot's own messages only serve as replies
+                if msg.get("user") == self._bot_user_id:
+                    bot_message_times.append(msg_ts)
+                    continue
 
                 # Skip if too recent
                 if msg_ts > cutoff_time:
@@ -183,23 +217,29 @@ class SlackChannelMonitor:
                 if max_message_age_seconds and msg_ts < oldest_time:
                     continue
 
-                # Check if bot replied after this message
-                bot_replied = False
-
-                # For thread messages, check thread replies
-                if msg.thread_ts:
-                    bot_replied = await self._check_bot_replied_in_thread(
-                        channel_id, msg.thread_ts, msg_ts
-                    )
+                # For thread messages, check thread replies below in one batch
+                thread_ts = msg.get("thread_ts")
+                if thread_ts:
+                    if msg_ts > thread_candidates.get(thread_ts, 0.0):
+                        thread_candidates[thread_ts] = msg_ts
                 else:
-                    # For channel messages, check if bot replied after this message
-                    for bot_time in bot_message_times:
-                        if bot_time > msg_ts:
-                            bot_replied = True
-                            break
-
+                    channel_candidates.append(msg_ts)
+
+            # For channel messages, check if bot replied after this message
+            latest_bot_time = max(bot_message_times, default=0.0)
+            if any(msg_ts >= latest_bot_time for msg_ts in channel_candidates):
+                unreplied_threads.add(None)
+
+            # Fetch thread replies concurrently instead of one round trip at a time
+            replied = await asyncio.gather(
+                *(
+                    self._check_bot_replied_in_thread(channel_id, thread_ts, msg_ts)
+                    for thread_ts, msg_ts in thread_candidates.items()
+                )
+            )
+            for thread_ts, bot_replied in zip(thread_candidates, replied):
                 if not bot_replied:
-                    unreplied_threads.add(msg.thread_ts)  # None or thread_ts
+                    unreplied_threads.add(thread_ts)
 
             return list(unreplied_threads)
 
@@ -226,32 +266,31 @@ class SlackChannelMonitor:
             True if bot has replied after the message.
         """
         try:
-            response = await self._client.conversations_replies(
-                channel=channel_id,
-                ts=thread_ts,
-                limit=self._message_limit,
-            )
-
-            for msg in response.get("messages", []):
-                msg_ts = float(msg["ts"])
-                user_id = msg.get("user", "")
-
-                # Check if bot replied after the message
-                if user_id == self._bot_user_id and msg_ts > message_ts:
-                    return True
+            async with self._replies_semaphore:
+                response = await self._client.conversations_replies(
+                    channel=channel_id,
+                    ts=thread_ts,
+                    limit=self._message_limit,
+                )
 
-            return False
+            # Check if bot replied after the message; only the bot's own
+            # replies need their ts parsed
+            return any(
+                msg.get("user") == self._bot_user_id and float(msg["ts"]) > message_ts
+                for msg in response.get("messages", [])
+            )
 
         except Exception as e:
             logger.warning(f"Failed to check thread replies: {e}")
             return False
 
-    async def _to_message(self, msg: dict, channel_id: str) -> Message:
+    async def _to_message(self, msg: dict, channel_id: str, ts: float) -> Message:
         """Convert Slack API response to Message entity.
 
         Args:
             msg: Slack API message object.
             channel_id: Channel ID.
+            ts: msg["ts"] already parsed to epoch seconds.
 
         Returns:
             Message entity.
@@ -264,7 +303,6 @@ class SlackChannelMonitor:
             # Mark as bot to exclude from response consideration.
             user = User(id="system", name="System", is_bot=True)
 
-        ts = float(msg["ts"])
         timestamp = datetime.fromtimestamp(ts, tz=timezone.utc)
 
         # Channel name is left empty to avoid extra API calls.
@@ -282,20 +320,35 @@ class SlackChannelMonitor:
     async def _get_user_info(self, user_id: str) -> User:
         """Get user information.
 
+        Results are cached per monitor for user_cache_ttl seconds, so the
+        same author appearing in many messages costs a single users.info call.
+
         Args:
             user_id: User ID.
 
         Returns:
             User entity.
         """
-        user_info = await self._client.users_info(user=user_id)
+        now = time.monotonic()
+        cached = self._user_cache.get(user_id)
+        if cached is not None and now - cached[0] < self._user_cache_ttl:
+            return cached[1]
+
+        try:
+            user_info = await self._client.users_info(user=user_id)
+        except SlackApiError:
+            # Drop a possibly stale entry so the next lookup retries the API
+            self._user_cache.pop(user_id, None)
+            raise
         user_data = user_info["user"]
 
-        return User(
+        user = User(
             id=user_data["id"],
             name=user_data["name"],
             is_bot=user_data.get("is_bot", False),
         )
+        self._user_cache[user_id] = (now, user)
+        return user
 
     def _extract_mentions(self, text: str) -> list[str]:
         """Extract mentions from text.
@@ -49,13 +49,13 @@ class SlackAppRunner:
             return False
         client = self._handler.client
         # Check synchronously available connection state attributes
-        # (SocketModeClient.is_connected() is async due to ping-pong check)
-        return (
-            not client.closed
-            and not client.stale
-            and client.current_session is not None
-            and not client.current_session.closed
-        )
+        # (SocketModeClient.is_connected() is async due to ping-pong check).
+        # The state is read live rather than cached in a flag, because the
+        # client reconnects on its own and a flag would go stale.
+        if client.closed or client.stale:
+            return False
+        session = client.current_session
+        return session is not None and not session.closed
 
     async def start(self) -> None:
         """Start the app using Socket Mode (async)."""
@@ -58,13 +58,12 @@ class SlackConversationHistoryService:
             limit=limit,
         )
 
-        messages = []
-        for msg in response.get("messages", []):
-            if msg.get("subtype") in self.EXCLUDED_SUBTYPES:
-                continue
-            messages.append(await self._to_message(msg, channel_id))
-
-        return messages  # Already in chronological order
+        # Already in chronological order
+        return [
+            await self._to_message(msg, channel_id)
+            for msg in response.get("messages", [])
+            if msg.get("subtype") not in self.EXCLUDED_SUBTYPES
+        ]
 
     async def fetch_channel_history(
         self,
@@ -87,14 +86,12 @@ class SlackConversationHistoryService:
             limit=limit,
         )
 
-        messages = []
-        for msg in response.get("messages", []):
-            if msg.get("subtype") in self.EXCLUDED_SUBTYPES:
-                continue
-            messages.append(await self._to_message(msg, channel_id))
-
-        # API returns newest first, so reverse to chronological order
-        return list(reversed(messages))
+        # API returns newest first, so walk it backwards for chronological order
+        return [
+            await self._to_message(msg, channel_id)
+            for msg in reversed(response.get("messages", []))
+            if msg.get("subtype") not in self.EXCLUDED_SUBTYPES
+        ]
 
     async def _to_message(self, msg: dict, channel_id: str) -> Message:
         """Convert Slack API response to Message entity.
@@ -1,5 +1,7 @@
 """Slack messaging service."""
 
+import asyncio
+
 from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
@@ -30,6 +32,7 @@ class SlackMessagingService:
         """
         self._client = client
         self._bot_user_id: str | None = None
+        self._bot_user_id_lock = asyncio.Lock()
 
     async def send_message(
         self,
@@ -75,9 +78,12 @@ class SlackMessagingService:
             The bot's user ID.
 
         Note:
-            The result is cached after the first call.
+            The result is cached after the first call. Concurrent first
+            calls share a single auth.test request.
         """
         if self._bot_user_id is None:
-            response = await self._client.auth_test()
-            self._bot_user_id = response["user_id"]
+            async with self._bot_user_id_lock:
+                if self._bot_user_id is None:
+                    response = await self._client.auth_test()
+                    self._bot_user_id = response["user_id"]
         return self._bot_user_id
@@ -0,0 +1,155 @@
+"""Persistence テスト共通設定"""
+
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from myao2.infrastructure.persistence import DatabaseManager
+
+# Import models to register them with SQLModel metadata
+from myao2.infrastructure.persistence import models as _models  # noqa: F401
+
+# xdist のワーカーごとに別名の共有キャッシュ・インメモリDB
+TEST_DATABASE_URL = (
+    "sqlite+aiosqlite:///file:myao2_{worker_id}?mode=memory&cache=shared&uri=true"
+)
+
+# テストの分離のために発行され、クエリ数の検証からは除外する文
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# スキーマの DDL は import 時に1回だけコンパイルし、
+# DB 構築時には create_all でメタデータを辿らず SQL を実行するだけにする
+_SCHEMA_DDL = [
+    str(ddl.compile(dialect=sqlite.dialect()))
+    for table in SQLModel.metadata.sorted_tables
+    for ddl in (
+        CreateTable(table),
+        *(CreateIndex(index) for index in table.indexes),
+    )
+]
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """テーブル定義を収集時に解決しておく
+
+    最初のテストだけがモデル import と metadata のソートを負担しないよう、
+    SQLModel.metadata を事前に温めておく（xdist の各ワーカーでも実行される）。
+    """
+    _ = SQLModel.metadata.sorted_tables
+
+
+@contextmanager
+def _record_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """ブロック内でエンジンが実行した SQL 文を記録する
+
+    session_factory フィクスチャがテストの分離のために発行する
+    SAVEPOINT 関連の文は記録しない。
+    """
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if not statement.startswith(_SAVEPOINT_STATEMENTS):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def count_queries() -> Callable[[AsyncEngine], AbstractContextManager[list[str]]]:
+    """エンジンで実行された SQL 文を記録するコンテキストマネージャを返す
+
+    リポジトリ操作の発行クエリ数が増えていないことを検証するために使う。
+    """
+    return _record_statements
+
+
+@pytest.fixture(scope="session")
+async def db_manager() -> AsyncGenerator[DatabaseManager, None]:
+    """テストセッション全体で共有するインメモリ DatabaseManager
+
+    テーブル作成（マイグレーション含む）はセッションで1回だけ行う。
+    各テストモジュールは自身が使うテーブルを autouse フィクスチャで空にする。
+    """
+    manager = DatabaseManager(":memory:")
+    await manager.create_tables()
+    yield manager
+    await manager.close()
+
+
+@pytest.fixture(scope="session")
+async def engine(worker_id: str) -> AsyncGenerator[AsyncEngine, None]:
+    """テストセッション全体で共有するインメモリ SQLite エンジン
+
+    スキーマの作成はセッションで1回だけ行う。StaticPool で単一の接続を
+    開いたままにし、セッションを開くたびの接続確立を省く。
+    DB 名に pytest-xdist のワーカー ID を含め、並列実行時にワーカー間で
+    DB を共有しないようにする。
+    """
+    engine = create_async_engine(
+        TEST_DATABASE_URL.format(worker_id=worker_id), poolclass=StaticPool
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_conn, _connection_record) -> None:
+        # テストデータは使い捨てなので fsync を省き、ロールバックジャーナルと
+        # 一時テーブルをメモリ上に置く（インメモリDBでは WAL は使えない）
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+        # pysqlite で SAVEPOINT が動くよう、BEGIN は SQLAlchemy 側で発行する
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _do_begin(conn) -> None:
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        for ddl in _SCHEMA_DDL:
+            await conn.exec_driver_sql(ddl)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def connection(engine: AsyncEngine) -> AsyncGenerator[AsyncConnection, None]:
+    """テストごとに外側のトランザクションを開き、終了時にロールバックする"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
+
+
+@pytest.fixture
+def session_factory(
+    connection: AsyncConnection,
+) -> async_sessionmaker[AsyncSession]:
+    """テストごとのトランザクションに結び付いたセッションファクトリ
+
+    セッションのコミットは SAVEPOINT の解放にとどまるため、
+    テストが書き込んだ内容は外側のロールバックですべて破棄される。
+    """
+    return async_sessionmaker(
+        bind=connection,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
@@ -0,0 +1,169 @@
+"""Tests for judgment cache top-level dedupe migration."""
+
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from myao2.infrastructure.persistence import DatabaseManager
+from myao2.infrastructure.persistence.migrations.judgment_dedupe_migration import (
+    migrate_judgment_cache_dedupe_top_level,
+)
+
+
+@pytest.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create in-memory SQLite async engine."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+async def create_old_judgment_caches_table(engine: AsyncEngine) -> None:
+    """Create the judgment_caches table without the partial unique index."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                CREATE TABLE judgment_caches (
+                    id INTEGER NOT NULL,
+                    channel_id VARCHAR NOT NULL,
+                    thread_ts VARCHAR,
+                    should_respond BOOLEAN NOT NULL,
+                    confidence FLOAT NOT NULL,
+                    reason VARCHAR NOT NULL,
+                    latest_message_ts VARCHAR NOT NULL,
+                    next_check_at DATETIME NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    updated_at DATETIME NOT NULL,
+                    PRIMARY KEY (id),
+                    CONSTRAINT uq_channel_thread UNIQUE (channel_id, thread_ts)
+                )
+            """)
+        )
+
+
+async def insert_old_cache(
+    engine: AsyncEngine,
+    channel_id: str,
+    updated_at: str,
+    thread_ts: str | None = None,
+    reason: str = "reason",
+) -> None:
+    """Insert a judgment cache into the old table."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO judgment_caches
+                    (channel_id, thread_ts, should_respond, confidence, reason,
+                     latest_message_ts, next_check_at, created_at, updated_at)
+                VALUES
+                    (:channel_id, :thread_ts, 0, 0.5, :reason, '1.000',
+                     '2024-01-02 00:00:00.000000', '2024-01-01 00:00:00.000000',
+                     :updated_at)
+            """),
+            {
+                "channel_id": channel_id,
+                "thread_ts": thread_ts,
+                "reason": reason,
+                "updated_at": updated_at,
+            },
+        )
+
+
+async def get_caches(engine: AsyncEngine) -> list[tuple[str, str | None, str]]:
+    """Return (channel_id, thread_ts, reason) of every cache."""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT channel_id, thread_ts, reason FROM judgment_caches "
+                "ORDER BY channel_id, thread_ts"
+            )
+        )
+        return [tuple(row) for row in result.fetchall()]
+
+
+class TestMigrateJudgmentCacheDedupeTopLevel:
+    """migrate_judgment_cache_dedupe_top_level function tests."""
+
+    async def test_migration_keeps_newest_top_level_cache_per_channel(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test only the most recently updated top-level cache survives."""
+        await create_old_judgment_caches_table(engine)
+        for channel_id, updated_at, reason in [
+            ("C1", "2024-01-01 00:00:00.000000", "old"),
+            ("C1", "2024-01-03 00:00:00.000000", "newest"),
+            ("C1", "2024-01-02 00:00:00.000000", "middle"),
+            ("C2", "2024-01-01 00:00:00.000000", "only"),
+        ]:
+            await insert_old_cache(engine, channel_id, updated_at, reason=reason)
+
+        await migrate_judgment_cache_dedupe_top_level(engine)
+
+        assert await get_caches(engine) == [
+            ("C1", None, "newest"),
+            ("C2", None, "only"),
+        ]
+
+    async def test_migration_keeps_thread_caches(self, engine: AsyncEngine) -> None:
+        """Test caches with a thread_ts are never removed."""
+        await create_old_judgment_caches_table(engine)
+        await insert_old_cache(engine, "C1", "2024-01-01 00:00:00.000000", "1.000")
+        await insert_old_cache(engine, "C1", "2024-01-01 00:00:00.000000", "2.000")
+        await insert_old_cache(engine, "C1", "2024-01-01 00:00:00.000000")
+
+        await migrate_judgment_cache_dedupe_top_level(engine)
+
+        assert len(await get_caches(engine)) == 3
+
+    async def test_migration_skips_if_index_exists(self, engine: AsyncEngine) -> None:
+        """Test migration does nothing once the partial index is in place."""
+        await create_old_judgment_caches_table(engine)
+        await insert_old_cache(engine, "C1", "2024-01-01 00:00:00.000000")
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "CREATE UNIQUE INDEX uq_channel_top_level "
+                    "ON judgment_caches (channel_id) WHERE thread_ts IS NULL"
+                )
+            )
+
+        await migrate_judgment_cache_dedupe_top_level(engine)
+
+        assert len(await get_caches(engine)) == 1
+
+    async def test_migration_skips_if_table_not_exists(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration does nothing if judgment_caches table doesn't exist."""
+        await migrate_judgment_cache_dedupe_top_level(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type='table'")
+            )
+            assert result.fetchall() == []
+
+    async def test_create_tables_succeeds_with_duplicate_top_level_caches(
+        self, tmp_path
+    ) -> None:
+        """Test create_tables adds the partial index to a database with duplicates."""
+        manager = DatabaseManager(str(tmp_path / "test.db"))
+        engine = manager.get_engine()
+        await create_old_judgment_caches_table(engine)
+        await insert_old_cache(engine, "C1", "2024-01-01 00:00:00.000000")
+        await insert_old_cache(engine, "C1", "2024-01-02 00:00:00.000000")
+
+        await manager.create_tables()
+
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT name FROM sqlite_master "
+                    "WHERE type='index' AND name='uq_channel_top_level'"
+                )
+            )
+            assert result.fetchone() is not None
+        assert len(await get_caches(engine)) == 1
+        await manager.close()
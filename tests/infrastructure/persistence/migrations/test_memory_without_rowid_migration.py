@@ -0,0 +1,160 @@
+"""Tests for memory WITHOUT ROWID migration."""
+
+from collections.abc import AsyncGenerator
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from myao2.infrastructure.persistence.migrations.memory_without_rowid_migration import (
+    migrate_memory_without_rowid,
+)
+
+
+@pytest.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create in-memory SQLite async engine."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+async def create_old_memories_table(engine: AsyncEngine) -> None:
+    """Create the old memories table with a surrogate id primary key."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                CREATE TABLE memories (
+                    id INTEGER NOT NULL,
+                    scope VARCHAR NOT NULL,
+                    scope_id VARCHAR NOT NULL,
+                    memory_type VARCHAR NOT NULL,
+                    content VARCHAR NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    updated_at DATETIME NOT NULL,
+                    source_message_count INTEGER NOT NULL,
+                    source_latest_message_ts VARCHAR,
+                    PRIMARY KEY (id),
+                    CONSTRAINT uq_scope_type UNIQUE (scope, scope_id, memory_type)
+                )
+            """)
+        )
+        await conn.execute(text("CREATE INDEX ix_memories_scope ON memories (scope)"))
+
+
+async def insert_old_memory(
+    engine: AsyncEngine,
+    scope_id: str,
+    memory_type: str = "long_term",
+    content: str = "Test",
+) -> None:
+    """Insert a memory into the old table."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO memories
+                    (scope, scope_id, memory_type, content, created_at,
+                     updated_at, source_message_count, source_latest_message_ts)
+                VALUES
+                    ('channel', :scope_id, :memory_type, :content, :now, :now,
+                     10, '1234.5678')
+            """),
+            {
+                "scope_id": scope_id,
+                "memory_type": memory_type,
+                "content": content,
+                "now": now,
+            },
+        )
+
+
+async def get_table_sql(engine: AsyncEngine) -> str | None:
+    """Return the CREATE TABLE statement of the memories table."""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type='table' AND name='memories'")
+        )
+        row = result.fetchone()
+    return None if row is None else row[0]
+
+
+class TestMigrateMemoryWithoutRowid:
+    """migrate_memory_without_rowid function tests."""
+
+    async def test_migration_on_empty_table(self, engine: AsyncEngine) -> None:
+        """Test migration rebuilds the table without the id column."""
+        await create_old_memories_table(engine)
+
+        await migrate_memory_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(text("PRAGMA table_info(memories)"))
+            primary_keys = {row[1] for row in result.fetchall() if row[5]}
+
+        assert primary_keys == {"scope", "scope_id", "memory_type"}
+        table_sql = await get_table_sql(engine)
+        assert table_sql is not None
+        assert "WITHOUT ROWID" in table_sql
+
+    async def test_migration_preserves_all_data(self, engine: AsyncEngine) -> None:
+        """Test migration copies every memory into the new table."""
+        await create_old_memories_table(engine)
+        await insert_old_memory(engine, "C001", "long_term", "Long-term")
+        await insert_old_memory(engine, "C001", "short_term", "Short-term")
+
+        await migrate_memory_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT scope, scope_id, memory_type, content, "
+                    "source_message_count, source_latest_message_ts "
+                    "FROM memories ORDER BY memory_type"
+                )
+            )
+            rows = [tuple(row) for row in result.fetchall()]
+
+        assert rows == [
+            ("channel", "C001", "long_term", "Long-term", 10, "1234.5678"),
+            ("channel", "C001", "short_term", "Short-term", 10, "1234.5678"),
+        ]
+
+    async def test_migration_drops_old_indexes(self, engine: AsyncEngine) -> None:
+        """Test migration removes indexes that belonged to the old table."""
+        await create_old_memories_table(engine)
+
+        await migrate_memory_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type='index'")
+            )
+            index_names = {row[0] for row in result.fetchall()}
+
+        assert "ix_memories_scope" not in index_names
+
+    async def test_migration_skips_if_already_migrated(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration is skipped if the id column is already gone."""
+        await create_old_memories_table(engine)
+        await insert_old_memory(engine, "C001")
+        await migrate_memory_without_rowid(engine)
+        table_sql = await get_table_sql(engine)
+
+        await migrate_memory_without_rowid(engine)
+
+        assert await get_table_sql(engine) == table_sql
+        async with engine.begin() as conn:
+            result = await conn.execute(text("SELECT COUNT(*) FROM memories"))
+            assert result.scalar() == 1
+
+    async def test_migration_skips_if_table_not_exists(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration does nothing if memories table doesn't exist."""
+        await migrate_memory_without_rowid(engine)
+
+        assert await get_table_sql(engine) is None
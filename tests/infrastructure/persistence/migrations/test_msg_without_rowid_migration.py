@@ -0,0 +1,165 @@
+"""Tests for message WITHOUT ROWID migration."""
+
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from myao2.infrastructure.persistence.migrations.msg_without_rowid_migration import (
+    migrate_message_without_rowid,
+)
+
+
+@pytest.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create in-memory SQLite async engine."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+async def create_old_messages_table(engine: AsyncEngine) -> None:
+    """Create the old messages table with a surrogate id primary key."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                CREATE TABLE messages (
+                    id INTEGER NOT NULL,
+                    message_id VARCHAR NOT NULL,
+                    channel_id VARCHAR NOT NULL,
+                    user_id VARCHAR NOT NULL,
+                    user_name VARCHAR NOT NULL,
+                    user_is_bot BOOLEAN NOT NULL,
+                    text VARCHAR NOT NULL,
+                    timestamp DATETIME NOT NULL,
+                    thread_ts VARCHAR,
+                    mentions VARCHAR NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    PRIMARY KEY (id),
+                    CONSTRAINT uq_message_channel UNIQUE (message_id, channel_id)
+                )
+            """)
+        )
+        await conn.execute(
+            text("CREATE INDEX ix_messages_message_id ON messages (message_id)")
+        )
+
+
+async def insert_old_message(
+    engine: AsyncEngine,
+    message_id: str,
+    channel_id: str = "C001",
+    thread_ts: str | None = None,
+) -> None:
+    """Insert a message into the old table."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO messages
+                    (message_id, channel_id, user_id, user_name, user_is_bot,
+                     text, timestamp, thread_ts, mentions, created_at)
+                VALUES
+                    (:message_id, :channel_id, 'U001', 'user', 0, 'Hello',
+                     '2024-01-01 00:00:00.000000', :thread_ts, '',
+                     '2024-01-01 00:00:00.000000')
+            """),
+            {
+                "message_id": message_id,
+                "channel_id": channel_id,
+                "thread_ts": thread_ts,
+            },
+        )
+
+
+async def get_table_sql(engine: AsyncEngine) -> str | None:
+    """Return the CREATE TABLE statement of the messages table."""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type='table' AND name='messages'")
+        )
+        row = result.fetchone()
+    return None if row is None else row[0]
+
+
+class TestMigrateMessageWithoutRowid:
+    """migrate_message_without_rowid function tests."""
+
+    async def test_migration_rebuilds_table_with_composite_key(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration rebuilds the table without the id column."""
+        await create_old_messages_table(engine)
+
+        await migrate_message_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(text("PRAGMA table_info(messages)"))
+            primary_keys = {row[1] for row in result.fetchall() if row[5]}
+
+        assert primary_keys == {"message_id", "channel_id"}
+        table_sql = await get_table_sql(engine)
+        assert table_sql is not None
+        assert "WITHOUT ROWID" in table_sql
+
+    async def test_migration_preserves_all_data(self, engine: AsyncEngine) -> None:
+        """Test migration copies every message into the new table."""
+        await create_old_messages_table(engine)
+        await insert_old_message(engine, "1.000")
+        await insert_old_message(engine, "1.001", thread_ts="1.000")
+        await insert_old_message(engine, "1.000", channel_id="C002")
+
+        await migrate_message_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT message_id, channel_id, thread_ts FROM messages "
+                    "ORDER BY channel_id, message_id"
+                )
+            )
+            rows = [tuple(row) for row in result.fetchall()]
+
+        assert rows == [
+            ("1.000", "C001", None),
+            ("1.001", "C001", "1.000"),
+            ("1.000", "C002", None),
+        ]
+
+    async def test_migration_drops_old_indexes(self, engine: AsyncEngine) -> None:
+        """Test migration removes indexes that belonged to the old table."""
+        await create_old_messages_table(engine)
+
+        await migrate_message_without_rowid(engine)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type='index'")
+            )
+            index_names = {row[0] for row in result.fetchall()}
+
+        assert "ix_messages_message_id" not in index_names
+
+    async def test_migration_skips_if_already_migrated(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration is skipped if the id column is already gone."""
+        await create_old_messages_table(engine)
+        await insert_old_message(engine, "1.000")
+        await migrate_message_without_rowid(engine)
+        table_sql = await get_table_sql(engine)
+
+        await migrate_message_without_rowid(engine)
+
+        assert await get_table_sql(engine) == table_sql
+        async with engine.begin() as conn:
+            result = await conn.execute(text("SELECT COUNT(*) FROM messages"))
+            assert result.scalar() == 1
+
+    async def test_migration_skips_if_table_not_exists(
+        self, engine: AsyncEngine
+    ) -> None:
+        """Test migration does nothing if messages table doesn't exist."""
+        await migrate_message_without_rowid(engine)
+
+        assert await get_table_sql(engine) is None
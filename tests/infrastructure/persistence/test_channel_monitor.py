@@ -1,7 +1,6 @@
 """Tests for DBChannelMonitor."""
 
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -30,14 +29,7 @@ async def engine() -> AsyncGenerator[AsyncEngine, None]:
 @pytest.fixture
 def session_factory(engine: AsyncEngine):
     """Create async session factory."""
-    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    @asynccontextmanager
-    async def get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with factory() as session:
-            yield session
-
-    return get_session
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 @pytest.fixture
@@ -1,7 +1,6 @@
 """Tests for SQLiteChannelRepository."""
 
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
@@ -25,14 +24,7 @@ async def engine() -> AsyncGenerator[AsyncEngine, None]:
 @pytest.fixture
 def session_factory(engine: AsyncEngine):
     """Create async session factory."""
-    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    @asynccontextmanager
-    async def get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with factory() as session:
-            yield session
-
-    return get_session
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 @pytest.fixture
@@ -95,6 +87,44 @@ class TestSave:
         assert await repository.find_by_id("C003") is not None
 
 
+class TestSaveMany:
+    """save_many method tests."""
+
+    async def test_save_many_spans_multiple_chunks(
+        self, repository: SQLiteChannelRepository
+    ) -> None:
+        """Test that more channels than fit in one statement are all saved."""
+        await repository.save_many(
+            [create_test_channel(id=f"C{i:04d}", name=f"ch-{i}") for i in range(600)]
+        )
+
+        assert len(await repository.find_all()) == 600
+
+    async def test_save_many_updates_existing_channel(
+        self, repository: SQLiteChannelRepository
+    ) -> None:
+        """Test that save_many upserts channels with an existing ID."""
+        await repository.save(create_test_channel(id="C001", name="old-name"))
+
+        await repository.save_many(
+            [
+                create_test_channel(id="C001", name="new-name"),
+                create_test_channel(id="C002", name="random"),
+            ]
+        )
+
+        found = await repository.find_by_id("C001")
+        assert found is not None
+        assert found.name == "new-name"
+        assert len(await repository.find_all()) == 2
+
+    async def test_save_many_empty(self, repository: SQLiteChannelRepository) -> None:
+        """Test that saving an empty list is a no-op."""
+        await repository.save_many([])
+
+        assert await repository.find_all() == []
+
+
 class TestFindAll:
     """find_all method tests."""
 
@@ -116,6 +146,19 @@ class TestFindAll:
         channel_ids = {c.id for c in result}
         assert channel_ids == {"C001", "C002", "C003"}
 
+    async def test_find_all_issues_single_query(
+        self, engine: AsyncEngine, repository: SQLiteChannelRepository, count_queries
+    ) -> None:
+        """Test that find_all loads all channels with a single query (no N+1)."""
+        for i in range(3):
+            await repository.save(create_test_channel(id=f"C00{i}", name=f"ch-{i}"))
+
+        with count_queries(engine) as statements:
+            result = await repository.find_all()
+
+        assert len(result) == 3
+        assert len(statements) == 1
+
     async def test_find_all_empty(self, repository: SQLiteChannelRepository) -> None:
         """Test finding all channels when no channels exist."""
         result = await repository.find_all()
@@ -184,3 +227,43 @@ class TestDelete:
 
         assert await repository.find_by_id("C001") is None
         assert await repository.find_by_id("C002") is not None
+
+
+class TestDeleteMany:
+    """delete_many method tests."""
+
+    async def test_delete_many_removes_only_given_channels(
+        self, repository: SQLiteChannelRepository
+    ) -> None:
+        """Test that the given channels are deleted and the count returned."""
+        await repository.save_many(
+            [create_test_channel(id=f"C00{i}", name=f"ch-{i}") for i in range(3)]
+        )
+
+        deleted = await repository.delete_many(["C000", "C002", "C999"])
+
+        assert deleted == 2
+        assert [c.id for c in await repository.find_all()] == ["C001"]
+
+    async def test_delete_many_spans_multiple_chunks(
+        self, repository: SQLiteChannelRepository
+    ) -> None:
+        """Test that more IDs than fit in one statement are all deleted."""
+        channels = [
+            create_test_channel(id=f"C{i:04d}", name=f"ch-{i}") for i in range(1200)
+        ]
+        await repository.save_many(channels)
+
+        deleted = await repository.delete_many([c.id for c in channels])
+
+        assert deleted == 1200
+        assert await repository.find_all() == []
+
+    async def test_delete_many_empty(
+        self, engine: AsyncEngine, repository: SQLiteChannelRepository, count_queries
+    ) -> None:
+        """Test that deleting nothing issues no query."""
+        with count_queries(engine) as statements:
+            assert await repository.delete_many([]) == 0
+
+        assert statements == []
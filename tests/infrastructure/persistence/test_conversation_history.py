@@ -1,13 +1,11 @@
 """Tests for DBConversationHistoryService."""
 
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import text
 
 from myao2.domain.entities import Channel, Message, User
 from myao2.infrastructure.persistence import SQLiteMessageRepository
@@ -16,41 +14,41 @@ from myao2.infrastructure.persistence.conversation_history import (
 )
 
 
-@pytest.fixture
-async def engine() -> AsyncGenerator[AsyncEngine, None]:
-    """Create in-memory SQLite async engine."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    yield engine
-    await engine.dispose()
-
-
-@pytest.fixture
-def session_factory(engine: AsyncEngine):
-    """Create async session factory."""
-    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    @asynccontextmanager
-    async def get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with factory() as session:
-            yield session
-
-    return get_session
-
-
 @pytest.fixture
 def message_repository(session_factory) -> SQLiteMessageRepository:
     """Create test message repository."""
     return SQLiteMessageRepository(session_factory)
 
 
+@pytest.fixture
+def bulk_insert_messages(
+    message_repository: SQLiteMessageRepository,
+) -> Callable[[list[Message]], Awaitable[None]]:
+    """Insert messages in a single transaction instead of one commit per save."""
+    return message_repository.save_many
+
+
 @pytest.fixture
 def service(message_repository) -> DBConversationHistoryService:
     """Create test service."""
     return DBConversationHistoryService(message_repository)
 
 
+DEFAULT_TIMESTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=16)
+def _channel(channel_id: str) -> Channel:
+    """Return a shared Channel instance (entities are frozen)."""
+    return Channel(id=channel_id, name="general")
+
+
+@lru_cache(maxsize=16)
+def _user(user_id: str, user_name: str, is_bot: bool) -> User:
+    """Return a shared User instance (entities are frozen)."""
+    return User(id=user_id, name=user_name, is_bot=is_bot)
+
+
 def create_test_message(
     id: str = "1234567890.123456",
     channel_id: str = "C123456",
@@ -65,10 +63,10 @@ def create_test_message(
     """Create a test Message entity."""
     return Message(
         id=id,
-        channel=Channel(id=channel_id, name="general"),
-        user=User(id=user_id, name=user_name, is_bot=is_bot),
+        channel=_channel(channel_id),
+        user=_user(user_id, user_name, is_bot),
         text=text,
-        timestamp=timestamp or datetime.now(timezone.utc),
+        timestamp=timestamp or DEFAULT_TIMESTAMP,
         thread_ts=thread_ts,
         mentions=mentions or [],
     )
@@ -80,7 +78,7 @@ class TestFetchThreadHistory:
     async def test_fetch_returns_messages_oldest_first(
         self,
         service: DBConversationHistoryService,
-        message_repository: SQLiteMessageRepository,
+        bulk_insert_messages: Callable[[list[Message]], Awaitable[None]],
     ) -> None:
         """Test that messages are returned in chronological order (oldest first)."""
         base_time = datetime.now(timezone.utc)
@@ -93,28 +91,26 @@ class TestFetchThreadHistory:
             )
             for i in range(3)
         ]
-        for msg in messages:
-            await message_repository.save(msg)
+        await bulk_insert_messages(messages)
 
         result = await service.fetch_thread_history("C123456", thread_ts)
 
-        assert len(result) == 3
         # Oldest first
-        assert result[0].id == "1.000"
-        assert result[1].id == "1.001"
-        assert result[2].id == "1.002"
+        assert [m.id for m in result] == ["1.000", "1.001", "1.002"]
 
     async def test_fetch_with_limit(
         self,
         service: DBConversationHistoryService,
-        message_repository: SQLiteMessageRepository,
+        bulk_insert_messages: Callable[[list[Message]], Awaitable[None]],
     ) -> None:
         """Test limit parameter."""
         thread_ts = "1.000"
-        for i in range(10):
-            await message_repository.save(
+        await bulk_insert_messages(
+            [
                 create_test_message(id=f"1.{i:03d}", thread_ts=thread_ts)
-            )
+                for i in range(10)
+            ]
+        )
 
         result = await service.fetch_thread_history("C123456", thread_ts, limit=3)
 
@@ -136,7 +132,7 @@ class TestFetchChannelHistory:
     async def test_fetch_returns_messages_oldest_first(
         self,
         service: DBConversationHistoryService,
-        message_repository: SQLiteMessageRepository,
+        bulk_insert_messages: Callable[[list[Message]], Awaitable[None]],
     ) -> None:
         """Test that messages are returned in chronological order (oldest first)."""
         base_time = datetime.now(timezone.utc)
@@ -147,24 +143,22 @@ class TestFetchChannelHistory:
             )
             for i in range(5)
         ]
-        for msg in messages:
-            await message_repository.save(msg)
+        await bulk_insert_messages(messages)
 
         result = await service.fetch_channel_history("C123456")
 
-        assert len(result) == 5
         # Oldest first
-        assert result[0].id == "1.000"
-        assert result[4].id == "1.004"
+        assert [m.id for m in result] == [f"1.{i:03d}" for i in range(5)]
 
     async def test_fetch_with_limit(
         self,
         service: DBConversationHistoryService,
-        message_repository: SQLiteMessageRepository,
+        bulk_insert_messages: Callable[[list[Message]], Awaitable[None]],
     ) -> None:
         """Test limit parameter."""
-        for i in range(10):
-            await message_repository.save(create_test_message(id=f"1.{i:03d}"))
+        await bulk_insert_messages(
+            [create_test_message(id=f"1.{i:03d}") for i in range(10)]
+        )
 
         result = await service.fetch_channel_history("C123456", limit=3)
 
@@ -173,7 +167,7 @@ class TestFetchChannelHistory:
     async def test_fetch_excludes_thread_messages(
         self,
         service: DBConversationHistoryService,
-        message_repository: SQLiteMessageRepository,
+        bulk_insert_messages: Callable[[list[Message]], Awaitable[None]],
     ) -> None:
         """Test that thread messages are excluded."""
         # Channel message
@@ -182,14 +176,11 @@ class TestFetchChannelHistory:
         thread_msg1 = create_test_message(id="1.002", thread_ts="1.000")
         thread_msg2 = create_test_message(id="1.003", thread_ts="1.000")
 
-        await message_repository.save(channel_msg)
-        await message_repository.save(thread_msg1)
-        await message_repository.save(thread_msg2)
+        await bulk_insert_messages([channel_msg, thread_msg1, thread_msg2])
 
         result = await service.fetch_channel_history("C123456")
 
-        assert len(result) == 1
-        assert result[0].id == "1.001"
+        assert [m.id for m in result] == ["1.001"]
 
     async def test_fetch_empty_channel(
         self,
@@ -199,3 +190,18 @@ class TestFetchChannelHistory:
         result = await service.fetch_channel_history("C999999")
 
         assert result == []
+
+    async def test_channel_history_uses_index(self, session_factory) -> None:
+        """Test that channel history lookups are served by the composite index."""
+        async with session_factory() as session:
+            result = await session.exec(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT * FROM messages "
+                    "WHERE channel_id = :channel_id AND thread_ts IS NULL "
+                    "ORDER BY timestamp DESC LIMIT 20"
+                ),
+                params={"channel_id": "C123456"},
+            )
+            plan = " ".join(row[-1] for row in result.all())
+
+        assert "USING INDEX ix_msg_channel_thread_ts" in plan
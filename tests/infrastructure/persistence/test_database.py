@@ -1,103 +1,158 @@
 """Tests for DatabaseManager."""
 
+from collections.abc import AsyncGenerator
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import inspect
+import pytest
+from sqlalchemy import Connection, inspect, text
+from sqlalchemy.pool import StaticPool
 
 from myao2.infrastructure.persistence import DatabaseManager
 
 
+@pytest.fixture(scope="session")
+async def db_schema(db_manager: DatabaseManager) -> dict[str, Any]:
+    """Schema of the shared database, introspected once per session."""
+
+    def introspect(sync_conn: Connection) -> dict[str, Any]:
+        inspector = inspect(sync_conn)
+        return {
+            "messages_columns": {
+                col["name"] for col in inspector.get_columns("messages")
+            },
+            "messages_primary_key": inspector.get_pk_constraint("messages"),
+        }
+
+    async with db_manager.get_engine().connect() as conn:
+        return await conn.run_sync(introspect)
+
+
+@pytest.fixture
+async def manager() -> AsyncGenerator[DatabaseManager, None]:
+    """Fresh in-memory DatabaseManager for tests that mutate manager state."""
+    manager = DatabaseManager(":memory:")
+    yield manager
+    await manager.close()
+
+
+async def get_table_names(manager: DatabaseManager) -> list[str]:
+    """Return the table names currently present in the manager's database."""
+    async with manager.get_engine().connect() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: inspect(sync_conn).get_table_names()
+        )
+
+
 class TestDatabaseManager:
     """DatabaseManager tests."""
 
-    def test_get_engine_with_valid_path(self, tmp_path: Path) -> None:
-        """Test engine creation with valid path."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
+    def test_get_engine_returns_cached_sqlite_engine(self) -> None:
+        """Test engine creation and caching."""
+        manager = DatabaseManager(":memory:")
 
         engine = manager.get_engine()
 
-        assert engine is not None
         assert "sqlite" in str(engine.url)
+        assert manager.get_engine() is engine
 
     def test_get_engine_creates_parent_directory(self, tmp_path: Path) -> None:
         """Test that parent directory is created if not exists."""
         db_path = tmp_path / "subdir" / "nested" / "test.db"
         manager = DatabaseManager(str(db_path))
 
-        manager.get_engine()
+        engine = manager.get_engine()
 
         assert db_path.parent.exists()
+        assert engine.url.database == str(db_path)
+
+    async def test_file_database_uses_wal_journal(self, tmp_path: Path) -> None:
+        """Test that file databases are opened in WAL mode."""
+        manager = DatabaseManager(str(tmp_path / "test.db"))
+
+        async with manager.get_engine().connect() as conn:
+            journal_mode = (
+                await conn.exec_driver_sql("PRAGMA journal_mode")
+            ).scalar_one()
+            synchronous = (
+                await conn.exec_driver_sql("PRAGMA synchronous")
+            ).scalar_one()
+        await manager.close()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+
+    async def test_connections_apply_performance_pragmas(
+        self, manager: DatabaseManager
+    ) -> None:
+        """Test that pragmas other than WAL are applied to in-memory databases."""
+        async with manager.get_engine().connect() as conn:
+            pragmas = {
+                name: (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar_one()
+                for name in ("synchronous", "temp_store", "cache_size", "busy_timeout")
+            }
+
+        assert pragmas == {
+            "synchronous": 1,  # NORMAL
+            "temp_store": 2,  # MEMORY
+            "cache_size": -64000,
+            "busy_timeout": 5000,
+        }
 
-    async def test_create_tables_first_time(self, tmp_path: Path) -> None:
+    async def test_create_tables_first_time(self, manager: DatabaseManager) -> None:
         """Test table creation on first run."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
         await manager.create_tables()
 
-        engine = manager.get_engine()
-        async with engine.connect() as conn:
-            tables = await conn.run_sync(
-                lambda sync_conn: inspect(sync_conn).get_table_names()
-            )
-
-        assert "messages" in tables
+        assert "messages" in await get_table_names(manager)
 
-    async def test_create_tables_already_exists(self, tmp_path: Path) -> None:
+    async def test_create_tables_already_exists(
+        self, db_manager: DatabaseManager
+    ) -> None:
         """Test table creation when tables already exist."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
+        # The shared manager has already created its tables once;
+        # a second call should not raise
+        await db_manager.create_tables()
 
-        # Should not raise error on second call
+        assert "messages" in await get_table_names(db_manager)
+
+    async def test_create_tables_adds_missing_index_to_existing_table(
+        self, manager: DatabaseManager
+    ) -> None:
+        """Test that indexes added after table creation are created."""
         await manager.create_tables()
+        engine = manager.get_engine()
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_msg_channel_thread_ts"))
+
         await manager.create_tables()
 
-        engine = manager.get_engine()
         async with engine.connect() as conn:
-            tables = await conn.run_sync(
-                lambda sync_conn: inspect(sync_conn).get_table_names()
+            index_names = await conn.run_sync(
+                lambda sync_conn: {
+                    index["name"]
+                    for index in inspect(sync_conn).get_indexes("messages")
+                }
             )
+        assert "ix_msg_channel_thread_ts" in index_names
 
-        assert "messages" in tables
-
-    async def test_get_session(self, tmp_path: Path) -> None:
+    async def test_get_session(self, db_manager: DatabaseManager) -> None:
         """Test session creation."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
-        await manager.create_tables()
-
-        async with manager.get_session() as session:
+        async with db_manager.get_session() as session:
             assert session is not None
 
-    async def test_in_memory_database(self) -> None:
-        """Test in-memory database."""
+    def test_in_memory_engine_uses_static_pool(self) -> None:
+        """Test that in-memory engine shares a single connection."""
         manager = DatabaseManager(":memory:")
-        await manager.create_tables()
 
         engine = manager.get_engine()
-        async with engine.connect() as conn:
-            tables = await conn.run_sync(
-                lambda sync_conn: inspect(sync_conn).get_table_names()
-            )
 
-        assert "messages" in tables
+        assert isinstance(engine.pool, StaticPool)
 
-    async def test_messages_table_has_correct_columns(self, tmp_path: Path) -> None:
+    def test_messages_table_has_correct_columns(
+        self, db_schema: dict[str, Any]
+    ) -> None:
         """Test that messages table has correct columns."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
-        await manager.create_tables()
-
-        engine = manager.get_engine()
-        async with engine.connect() as conn:
-            columns = await conn.run_sync(
-                lambda sync_conn: {
-                    col["name"] for col in inspect(sync_conn).get_columns("messages")
-                }
-            )
-
         expected_columns = {
-            "id",
             "message_id",
             "channel_id",
             "user_id",
@@ -109,27 +164,17 @@ class TestDatabaseManager:
             "mentions",
             "created_at",
         }
-        assert columns == expected_columns
+        assert db_schema["messages_columns"] == expected_columns
 
-    async def test_messages_table_has_unique_constraint(self, tmp_path: Path) -> None:
-        """Test that messages table has unique constraint."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
-        await manager.create_tables()
+    def test_messages_table_has_composite_primary_key(
+        self, db_schema: dict[str, Any]
+    ) -> None:
+        """Test that messages are keyed by (message_id, channel_id)."""
+        primary_key = db_schema["messages_primary_key"]["constrained_columns"]
+        assert primary_key == ["message_id", "channel_id"]
 
-        engine = manager.get_engine()
-        async with engine.connect() as conn:
-            unique_constraints = await conn.run_sync(
-                lambda sync_conn: inspect(sync_conn).get_unique_constraints("messages")
-            )
-
-        constraint_names = [c["name"] for c in unique_constraints]
-        assert "uq_message_channel" in constraint_names
-
-    async def test_close_disposes_engine(self, tmp_path: Path) -> None:
+    async def test_close_disposes_engine(self, manager: DatabaseManager) -> None:
         """Test that close disposes engine and clears references."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
         await manager.create_tables()
 
         # Engine should be initialized
@@ -158,22 +203,22 @@ class TestDatabaseManager:
 class TestDatabaseManagerIsHealthy:
     """Tests for is_healthy method."""
 
-    async def test_is_healthy_returns_true_when_connected(self, tmp_path: Path) -> None:
+    async def test_is_healthy_returns_true_when_connected(
+        self, manager: DatabaseManager
+    ) -> None:
         """Test that is_healthy returns True when database is accessible."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
-        await manager.create_tables()
+        # The health probe is a bare SELECT 1, so no schema is needed
+        manager.get_engine()
 
         result = await manager.is_healthy()
 
         assert result is True
 
-    async def test_is_healthy_returns_true_for_in_memory_db(self) -> None:
+    async def test_is_healthy_returns_true_for_in_memory_db(
+        self, db_manager: DatabaseManager
+    ) -> None:
         """Test that is_healthy returns True for in-memory database."""
-        manager = DatabaseManager(":memory:")
-        await manager.create_tables()
-
-        result = await manager.is_healthy()
+        result = await db_manager.is_healthy()
 
         assert result is True
 
@@ -186,11 +231,11 @@ class TestDatabaseManagerIsHealthy:
 
         assert result is False
 
-    async def test_is_healthy_returns_false_after_close(self, tmp_path: Path) -> None:
+    async def test_is_healthy_returns_false_after_close(
+        self, manager: DatabaseManager
+    ) -> None:
         """Test that is_healthy returns False after close() is called."""
-        db_path = tmp_path / "test.db"
-        manager = DatabaseManager(str(db_path))
-        await manager.create_tables()
+        manager.get_engine()
 
         # Should be healthy before close
         assert await manager.is_healthy() is True
@@ -3,20 +3,21 @@
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlmodel import delete, select
 
 from myao2.domain.entities.judgment_cache import JudgmentCache
-from myao2.infrastructure.persistence import DatabaseManager
+from myao2.infrastructure.persistence import DatabaseManager, JudgmentCacheModel
 from myao2.infrastructure.persistence.judgment_cache_repository import (
     SQLiteJudgmentCacheRepository,
 )
 
 
-@pytest.fixture
-async def db_manager() -> DatabaseManager:
-    """Create an in-memory database manager."""
-    manager = DatabaseManager(":memory:")
-    await manager.create_tables()
-    return manager
+@pytest.fixture(autouse=True)
+async def clear_judgment_caches(db_manager: DatabaseManager) -> None:
+    """Delete all caches so each test starts from an empty table."""
+    async with db_manager.get_session() as session:
+        await session.exec(delete(JudgmentCacheModel))
+        await session.commit()
 
 
 @pytest.fixture
@@ -63,6 +64,18 @@ def top_level_cache(now: datetime) -> JudgmentCache:
     )
 
 
+@pytest.fixture
+async def populated_repo(
+    repository: SQLiteJudgmentCacheRepository,
+    sample_cache: JudgmentCache,
+    top_level_cache: JudgmentCache,
+) -> SQLiteJudgmentCacheRepository:
+    """Create a repository pre-populated with a thread and a top-level cache."""
+    await repository.save(sample_cache)
+    await repository.save(top_level_cache)
+    return repository
+
+
 class TestSQLiteJudgmentCacheRepositorySave:
     """Tests for save method."""
 
@@ -142,50 +155,73 @@ class TestSQLiteJudgmentCacheRepositorySave:
         assert result.reason == "Now interesting"
         assert result.latest_message_ts == "1234567891.000000"
 
-
-class TestSQLiteJudgmentCacheRepositoryFindByScope:
-    """Tests for find_by_scope method."""
-
-    async def test_find_existing_cache(
+    async def test_save_updates_existing_top_level_cache(
         self,
+        db_manager: DatabaseManager,
         repository: SQLiteJudgmentCacheRepository,
-        sample_cache: JudgmentCache,
+        top_level_cache: JudgmentCache,
+        now: datetime,
     ) -> None:
-        """Test finding an existing cache."""
-        await repository.save(sample_cache)
+        """Test that top-level caches (NULL thread_ts) are upserted, not duplicated."""
+        await repository.save(top_level_cache)
 
-        result = await repository.find_by_scope(
-            sample_cache.channel_id,
-            sample_cache.thread_ts,
+        updated_cache = JudgmentCache(
+            channel_id=top_level_cache.channel_id,
+            thread_ts=None,
+            should_respond=False,
+            confidence=0.4,
+            reason="No longer relevant",
+            latest_message_ts="9876543211.000000",
+            next_check_at=now + timedelta(hours=24),
+            created_at=top_level_cache.created_at,
+            updated_at=now + timedelta(minutes=30),
         )
+        await repository.save(updated_cache)
 
-        assert result is not None
-        assert result.channel_id == sample_cache.channel_id
+        async with db_manager.get_session() as session:
+            rows = (
+                await session.exec(
+                    select(JudgmentCacheModel).where(
+                        JudgmentCacheModel.channel_id == top_level_cache.channel_id
+                    )
+                )
+            ).all()
 
-    async def test_find_nonexistent_cache(
-        self,
-        repository: SQLiteJudgmentCacheRepository,
-    ) -> None:
-        """Test finding a nonexistent cache returns None."""
-        result = await repository.find_by_scope("C999", "nonexistent")
+        assert len(rows) == 1
+        assert rows[0].reason == "No longer relevant"
+        assert rows[0].should_respond is False
 
-        assert result is None
 
-    async def test_find_top_level_cache(
+class TestSQLiteJudgmentCacheRepositoryFindByScope:
+    """Tests for find_by_scope method."""
+
+    @pytest.mark.parametrize(
+        ("channel_id", "thread_ts", "expected_reason"),
+        [
+            ("C123", "1234567890.123456", "Not interesting"),
+            ("C456", None, "User needs help"),
+            ("C999", "nonexistent", None),
+            ("C123", None, None),
+            ("C456", "1234567890.123456", None),
+        ],
+    )
+    async def test_find_by_scope(
         self,
-        repository: SQLiteJudgmentCacheRepository,
-        top_level_cache: JudgmentCache,
+        populated_repo: SQLiteJudgmentCacheRepository,
+        channel_id: str,
+        thread_ts: str | None,
+        expected_reason: str | None,
     ) -> None:
-        """Test finding a top-level cache (thread_ts is None)."""
-        await repository.save(top_level_cache)
+        """Test finding caches by (channel_id, thread_ts) scope."""
+        result = await populated_repo.find_by_scope(channel_id, thread_ts)
 
-        result = await repository.find_by_scope(
-            top_level_cache.channel_id,
-            None,
-        )
-
-        assert result is not None
-        assert result.thread_ts is None
+        if expected_reason is None:
+            assert result is None
+        else:
+            assert result is not None
+            assert result.channel_id == channel_id
+            assert result.thread_ts == thread_ts
+            assert result.reason == expected_reason
 
     async def test_find_distinguishes_thread_and_top_level(
         self,
@@ -311,32 +347,27 @@ class TestSQLiteJudgmentCacheRepositoryDeleteByScope:
 
     async def test_delete_by_scope(
         self,
-        repository: SQLiteJudgmentCacheRepository,
+        populated_repo: SQLiteJudgmentCacheRepository,
         sample_cache: JudgmentCache,
+        top_level_cache: JudgmentCache,
     ) -> None:
-        """Test deleting a cache by scope."""
-        await repository.save(sample_cache)
-
-        # Verify it exists
-        result = await repository.find_by_scope(
-            sample_cache.channel_id,
-            sample_cache.thread_ts,
-        )
-        assert result is not None
-
-        # Delete it
-        await repository.delete_by_scope(
+        """Test deleting a cache by scope leaves other scopes untouched."""
+        await populated_repo.delete_by_scope(
             sample_cache.channel_id,
             sample_cache.thread_ts,
         )
 
         # Verify it's gone
-        result = await repository.find_by_scope(
+        result = await populated_repo.find_by_scope(
             sample_cache.channel_id,
             sample_cache.thread_ts,
         )
         assert result is None
 
+        # Other scopes are kept
+        other = await populated_repo.find_by_scope(top_level_cache.channel_id, None)
+        assert other is not None
+
     async def test_delete_by_scope_nonexistent(
         self,
         repository: SQLiteJudgmentCacheRepository,
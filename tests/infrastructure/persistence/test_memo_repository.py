@@ -1,46 +1,38 @@
 """Tests for SQLiteMemoRepository."""
 
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import nullcontext
 from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import text
 
 from myao2.domain.entities.memo import Memo
 from myao2.infrastructure.persistence.memo_repository import SQLiteMemoRepository
 
 
 @pytest.fixture
-async def engine() -> AsyncGenerator[AsyncEngine, None]:
-    """Create in-memory SQLite async engine."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    yield engine
-    await engine.dispose()
+def repository(session_factory) -> SQLiteMemoRepository:
+    """Create test repository."""
+    return SQLiteMemoRepository(session_factory)
 
 
 @pytest.fixture
-def session_factory(engine: AsyncEngine):
-    """Create async session factory."""
-    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async def scoped_repository(
+    session_factory,
+) -> AsyncGenerator[SQLiteMemoRepository, None]:
+    """Create a repository whose operations all share one session.
 
-    @asynccontextmanager
-    async def get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with factory() as session:
-            yield session
+    The repository normally opens a new session per call; binding it to a
+    single session saves the checkout on every save/find within a test.
+    """
+    async with session_factory() as session:
+        yield SQLiteMemoRepository(lambda: nullcontext(session))
 
-    return get_session
 
-
-@pytest.fixture
-def repository(session_factory) -> SQLiteMemoRepository:
-    """Create test repository."""
-    return SQLiteMemoRepository(session_factory)
+# Fixed clock so timestamps are deterministic across runs
+_FIXED_NOW = datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
 
 
 def create_test_memo(
@@ -54,17 +46,16 @@ def create_test_memo(
     updated_at: datetime | None = None,
 ) -> Memo:
     """Create a test Memo entity."""
-    now = datetime.now(timezone.utc)
     memo_id = id or uuid4()
     return Memo(
         id=memo_id,
         name=name or str(memo_id)[:8],
         content=content,
         priority=priority,
-        tags=tags or [],
+        tags=list(tags or ()),
         detail=detail,
-        created_at=created_at or now,
-        updated_at=updated_at or now,
+        created_at=created_at or _FIXED_NOW,
+        updated_at=updated_at or _FIXED_NOW,
     )
 
 
@@ -94,7 +85,6 @@ class TestSave:
         await repository.save(original)
 
         # Update memo
-        now = datetime.now(timezone.utc)
         updated = Memo(
             id=memo_id,
             name="original-memo",
@@ -103,7 +93,7 @@ class TestSave:
             tags=["updated"],
             detail="New detail",
             created_at=original.created_at,
-            updated_at=now,
+            updated_at=_FIXED_NOW + timedelta(minutes=5),
         )
         await repository.save(updated)
 
@@ -115,6 +105,44 @@ class TestSave:
         assert found.detail == "New detail"
 
 
+class TestSaveMany:
+    """save_many method tests."""
+
+    async def test_save_many_spans_multiple_chunks(
+        self, repository: SQLiteMemoRepository
+    ) -> None:
+        """Test that more memos than fit in one statement are all saved."""
+        await repository.save_many(
+            [create_test_memo(content=f"Memo {i}") for i in range(300)]
+        )
+
+        assert await repository.count() == 300
+
+    async def test_save_many_updates_existing_memo(
+        self, repository: SQLiteMemoRepository
+    ) -> None:
+        """Test that save_many upserts memos with an existing ID."""
+        original = create_test_memo(name="bulk-memo", content="Original")
+        await repository.save(original)
+
+        updated = create_test_memo(
+            id=original.id, name="bulk-memo", content="Updated", priority=5
+        )
+        await repository.save_many([updated, create_test_memo(content="New")])
+
+        found = await repository.find_by_id(original.id)
+        assert found is not None
+        assert found.content == "Updated"
+        assert found.priority == 5
+        assert await repository.count() == 2
+
+    async def test_save_many_empty(self, repository: SQLiteMemoRepository) -> None:
+        """Test that saving an empty list is a no-op."""
+        await repository.save_many([])
+
+        assert await repository.count() == 0
+
+
 class TestFindById:
     """find_by_id method tests."""
 
@@ -141,17 +169,19 @@ class TestFindById:
 class TestFindAll:
     """find_all method tests."""
 
-    async def test_find_all_empty(self, repository: SQLiteMemoRepository) -> None:
+    async def test_find_all_empty(
+        self, scoped_repository: SQLiteMemoRepository
+    ) -> None:
         """Test find_all on empty database."""
-        result = await repository.find_all()
+        result = await scoped_repository.find_all()
 
         assert result == []
 
     async def test_find_all_multiple_sorted(
-        self, repository: SQLiteMemoRepository
+        self, scoped_repository: SQLiteMemoRepository
     ) -> None:
         """Test find_all returns memos sorted by priority desc, then updated_at desc."""
-        base_time = datetime.now(timezone.utc)
+        base_time = _FIXED_NOW
 
         # Create memos with different priorities and times
         memo1 = create_test_memo(
@@ -170,11 +200,9 @@ class TestFindAll:
             updated_at=base_time,
         )
 
-        await repository.save(memo1)
-        await repository.save(memo2)
-        await repository.save(memo3)
+        await scoped_repository.save_many([memo1, memo2, memo3])
 
-        result = await repository.find_all()
+        result = await scoped_repository.find_all()
 
         assert len(result) == 3
         # Priority 5 first
@@ -185,17 +213,32 @@ class TestFindAll:
         assert result[2].content == "Priority 3 older"
 
     async def test_find_all_with_offset_limit(
-        self, repository: SQLiteMemoRepository
+        self, scoped_repository: SQLiteMemoRepository
     ) -> None:
         """Test find_all with offset and limit."""
-        for i in range(5):
-            await repository.save(create_test_memo(content=f"Memo {i}", priority=5 - i))
+        await scoped_repository.save_many(
+            [create_test_memo(content=f"Memo {i}", priority=5 - i) for i in range(5)]
+        )
 
         # Get 2 memos starting from offset 1
-        result = await repository.find_all(offset=1, limit=2)
+        result = await scoped_repository.find_all(offset=1, limit=2)
 
         assert len(result) == 2
 
+    async def test_find_all_uses_index(self, session_factory) -> None:
+        """Test that find_all ordering is served by the composite index."""
+        async with session_factory() as session:
+            result = await session.exec(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT * FROM memos "
+                    "ORDER BY priority DESC, updated_at DESC LIMIT 10"
+                )
+            )
+            plan = " ".join(row[-1] for row in result.all())
+
+        assert "USING INDEX ix_memo_priority_updated" in plan
+        assert "TEMP B-TREE" not in plan
+
 
 class TestFindByPriorityGte:
     """find_by_priority_gte method tests."""
@@ -207,10 +250,7 @@ class TestFindByPriorityGte:
         memo3 = create_test_memo(content="Priority 5", priority=5)
         memo4 = create_test_memo(content="Priority 3", priority=3)
 
-        await repository.save(memo1)
-        await repository.save(memo2)
-        await repository.save(memo3)
-        await repository.save(memo4)
+        await repository.save_many([memo1, memo2, memo3, memo4])
 
         # Get memos with priority >= 4
         result = await repository.find_by_priority_gte(4)
@@ -225,8 +265,9 @@ class TestFindByPriorityGte:
         self, repository: SQLiteMemoRepository
     ) -> None:
         """Test find_by_priority_gte respects limit."""
-        for i in range(10):
-            await repository.save(create_test_memo(content=f"Memo {i}", priority=5))
+        await repository.save_many(
+            [create_test_memo(content=f"Memo {i}", priority=5) for i in range(10)]
+        )
 
         result = await repository.find_by_priority_gte(4, limit=3)
 
@@ -238,16 +279,18 @@ class TestFindRecent:
 
     async def test_find_recent(self, repository: SQLiteMemoRepository) -> None:
         """Test finding recent memos sorted by updated_at desc."""
-        base_time = datetime.now(timezone.utc)
+        base_time = _FIXED_NOW
 
-        for i in range(5):
-            await repository.save(
+        await repository.save_many(
+            [
                 create_test_memo(
                     content=f"Memo {i}",
                     priority=3,
                     updated_at=base_time + timedelta(minutes=i),
                 )
-            )
+                for i in range(5)
+            ]
+        )
 
         result = await repository.find_recent(limit=3)
 
@@ -261,39 +304,41 @@ class TestFindRecent:
 class TestFindByTag:
     """find_by_tag method tests."""
 
-    async def test_find_by_tag(self, repository: SQLiteMemoRepository) -> None:
+    async def test_find_by_tag(self, scoped_repository: SQLiteMemoRepository) -> None:
         """Test finding memos by tag."""
         memo1 = create_test_memo(content="Has target tag", tags=["user", "schedule"])
         memo2 = create_test_memo(content="No target tag", tags=["other"])
         memo3 = create_test_memo(content="Also has target tag", tags=["user"])
 
-        await repository.save(memo1)
-        await repository.save(memo2)
-        await repository.save(memo3)
+        await scoped_repository.save_many([memo1, memo2, memo3])
 
-        result = await repository.find_by_tag("user")
+        result = await scoped_repository.find_by_tag("user")
 
         assert len(result) == 2
         assert all("user" in m.tags for m in result)
 
-    async def test_find_by_tag_no_match(self, repository: SQLiteMemoRepository) -> None:
+    async def test_find_by_tag_no_match(
+        self, scoped_repository: SQLiteMemoRepository
+    ) -> None:
         """Test find_by_tag returns empty when no match."""
-        await repository.save(create_test_memo(tags=["other"]))
+        await scoped_repository.save(create_test_memo(tags=["other"]))
 
-        result = await repository.find_by_tag("nonexistent")
+        result = await scoped_repository.find_by_tag("nonexistent")
 
         assert result == []
 
     async def test_find_by_tag_with_offset_limit(
-        self, repository: SQLiteMemoRepository
+        self, scoped_repository: SQLiteMemoRepository
     ) -> None:
         """Test find_by_tag with offset and limit."""
-        for i in range(5):
-            await repository.save(
+        await scoped_repository.save_many(
+            [
                 create_test_memo(content=f"Memo {i}", tags=["common"], priority=5 - i)
-            )
+                for i in range(5)
+            ]
+        )
 
-        result = await repository.find_by_tag("common", offset=1, limit=2)
+        result = await scoped_repository.find_by_tag("common", offset=1, limit=2)
 
         assert len(result) == 2
 
@@ -305,16 +350,17 @@ class TestGetAllTagsWithStats:
         self, repository: SQLiteMemoRepository
     ) -> None:
         """Test getting tag statistics."""
-        base_time = datetime.now(timezone.utc)
+        base_time = _FIXED_NOW
 
-        await repository.save(
-            create_test_memo(
-                tags=["user", "schedule"], updated_at=base_time - timedelta(hours=1)
-            )
-        )
-        await repository.save(create_test_memo(tags=["user"], updated_at=base_time))
-        await repository.save(
-            create_test_memo(tags=["preference"], updated_at=base_time)
+        await repository.save_many(
+            [
+                create_test_memo(
+                    tags=["user", "schedule"],
+                    updated_at=base_time - timedelta(hours=1),
+                ),
+                create_test_memo(tags=["user"], updated_at=base_time),
+                create_test_memo(tags=["preference"], updated_at=base_time),
+            ]
         )
 
         result = await repository.get_all_tags_with_stats()
@@ -414,8 +460,9 @@ class TestCount:
 
     async def test_count_all(self, repository: SQLiteMemoRepository) -> None:
         """Test counting all memos."""
-        for i in range(5):
-            await repository.save(create_test_memo(content=f"Memo {i}"))
+        await repository.save_many(
+            [create_test_memo(content=f"Memo {i}") for i in range(5)]
+        )
 
         result = await repository.count()
 
@@ -423,9 +470,13 @@ class TestCount:
 
     async def test_count_by_tag(self, repository: SQLiteMemoRepository) -> None:
         """Test counting memos with specific tag."""
-        await repository.save(create_test_memo(tags=["user"]))
-        await repository.save(create_test_memo(tags=["user", "schedule"]))
-        await repository.save(create_test_memo(tags=["other"]))
+        await repository.save_many(
+            [
+                create_test_memo(tags=["user"]),
+                create_test_memo(tags=["user", "schedule"]),
+                create_test_memo(tags=["other"]),
+            ]
+        )
 
         result = await repository.count(tag="user")
 
@@ -1,22 +1,27 @@
 """Tests for SQLiteMemoryRepository."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlmodel import delete, text
 
 from myao2.domain.entities.memory import Memory, MemoryScope, MemoryType
-from myao2.infrastructure.persistence import DatabaseManager
+from myao2.infrastructure.persistence import DatabaseManager, MemoryModel
 from myao2.infrastructure.persistence.memory_repository import (
     SQLiteMemoryRepository,
 )
 
+_NOW = datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+_NOW_PLUS_1_DAY = _NOW + timedelta(days=1)
+_NOW_PLUS_2_DAYS = _NOW + timedelta(days=2)
 
-@pytest.fixture
-async def db_manager() -> DatabaseManager:
-    """Create an in-memory database manager."""
-    manager = DatabaseManager(":memory:")
-    await manager.create_tables()
-    return manager
+
+@pytest.fixture(autouse=True)
+async def clear_memories(db_manager: DatabaseManager) -> None:
+    """Delete all memories so each test starts from an empty table."""
+    async with db_manager.get_session() as session:
+        await session.exec(delete(MemoryModel))
+        await session.commit()
 
 
 @pytest.fixture
@@ -25,13 +30,17 @@ def repository(db_manager: DatabaseManager) -> SQLiteMemoryRepository:
     return SQLiteMemoryRepository(db_manager.get_session)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def now() -> datetime:
-    """Create a fixed current time for testing."""
-    return datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+    """Create a fixed current time for testing.
 
+    Memory is a frozen dataclass, so this and the sample memory fixtures are
+    built once per module and shared between tests.
+    """
+    return _NOW
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def channel_long_term_memory(now: datetime) -> Memory:
     """Create a sample channel long-term memory."""
     return Memory(
@@ -46,7 +55,7 @@ def channel_long_term_memory(now: datetime) -> Memory:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def channel_short_term_memory(now: datetime) -> Memory:
     """Create a sample channel short-term memory."""
     return Memory(
@@ -61,7 +70,7 @@ def channel_short_term_memory(now: datetime) -> Memory:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def workspace_memory(now: datetime) -> Memory:
     """Create a sample workspace memory."""
     return Memory(
@@ -76,7 +85,7 @@ def workspace_memory(now: datetime) -> Memory:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def thread_memory(now: datetime) -> Memory:
     """Create a sample thread short-term memory."""
     return Memory(
@@ -90,35 +99,34 @@ def thread_memory(now: datetime) -> Memory:
     )
 
 
+_SAMPLE_MEMORIES = ["channel_long_term_memory", "workspace_memory", "thread_memory"]
+
+
+@pytest.fixture
+def memory(request: pytest.FixtureRequest) -> Memory:
+    """Resolve the sample memory fixture named by the indirect parameter."""
+    return request.getfixturevalue(request.param)
+
+
 class TestSQLiteMemoryRepositorySave:
     """Tests for save method."""
 
+    @pytest.mark.parametrize("memory", _SAMPLE_MEMORIES, indirect=True)
     async def test_save_new_memory(
         self,
         repository: SQLiteMemoryRepository,
-        channel_long_term_memory: Memory,
+        memory: Memory,
     ) -> None:
-        """Test saving a new memory."""
-        await repository.save(channel_long_term_memory)
+        """Test saving a new memory in each scope."""
+        await repository.save(memory)
 
         result = await repository.find_by_scope_and_type(
-            channel_long_term_memory.scope,
-            channel_long_term_memory.scope_id,
-            channel_long_term_memory.memory_type,
+            memory.scope,
+            memory.scope_id,
+            memory.memory_type,
         )
 
-        assert result is not None
-        assert result.scope == channel_long_term_memory.scope
-        assert result.scope_id == channel_long_term_memory.scope_id
-        assert result.memory_type == channel_long_term_memory.memory_type
-        assert result.content == channel_long_term_memory.content
-        assert (
-            result.source_message_count == channel_long_term_memory.source_message_count
-        )
-        assert (
-            result.source_latest_message_ts
-            == channel_long_term_memory.source_latest_message_ts
-        )
+        assert result == memory
 
     async def test_save_updates_existing_memory(
         self,
@@ -135,7 +143,7 @@ class TestSQLiteMemoryRepositorySave:
             memory_type=channel_long_term_memory.memory_type,
             content="Updated content",
             created_at=channel_long_term_memory.created_at,
-            updated_at=datetime(2024, 1, 16, 12, 0, 0, tzinfo=timezone.utc),
+            updated_at=_NOW_PLUS_1_DAY,
             source_message_count=20,
             source_latest_message_ts="1234567891.000000",
         )
@@ -168,7 +176,7 @@ class TestSQLiteMemoryRepositorySave:
             memory_type=channel_long_term_memory.memory_type,
             content="Updated again",
             created_at=channel_long_term_memory.created_at,
-            updated_at=datetime(2024, 1, 17, 12, 0, 0, tzinfo=timezone.utc),
+            updated_at=_NOW_PLUS_2_DAYS,
             source_message_count=30,
         )
 
@@ -182,61 +190,99 @@ class TestSQLiteMemoryRepositorySave:
 
         assert len(memories) == 1
 
-    async def test_save_workspace_memory(
+
+class TestSQLiteMemoryRepositorySaveMany:
+    """Tests for save_many method."""
+
+    async def test_save_many_new_memories(
         self,
         repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+        channel_short_term_memory: Memory,
         workspace_memory: Memory,
     ) -> None:
-        """Test saving a workspace memory."""
-        await repository.save(workspace_memory)
+        """Test saving several new memories at once."""
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory, workspace_memory]
+        )
 
-        result = await repository.find_by_scope_and_type(
+        channel_memories = await repository.find_all_by_scope(
+            MemoryScope.CHANNEL,
+            "C1234567890",
+        )
+        workspace_result = await repository.find_by_scope_and_type(
             MemoryScope.WORKSPACE,
             "default",
             MemoryType.LONG_TERM,
         )
 
-        assert result is not None
-        assert result.scope == MemoryScope.WORKSPACE
+        assert len(channel_memories) == 2
+        assert workspace_result is not None
 
-    async def test_save_thread_memory(
+    async def test_save_many_updates_existing_memory(
         self,
         repository: SQLiteMemoryRepository,
-        thread_memory: Memory,
+        channel_long_term_memory: Memory,
+        channel_short_term_memory: Memory,
     ) -> None:
-        """Test saving a thread memory."""
-        await repository.save(thread_memory)
+        """Test that save_many upserts memories with an existing scope/type."""
+        await repository.save(channel_long_term_memory)
 
-        result = await repository.find_by_scope_and_type(
-            MemoryScope.THREAD,
-            "C1234567890:1234567890.123456",
-            MemoryType.SHORT_TERM,
+        updated_memory = Memory(
+            scope=channel_long_term_memory.scope,
+            scope_id=channel_long_term_memory.scope_id,
+            memory_type=channel_long_term_memory.memory_type,
+            content="Updated content",
+            created_at=channel_long_term_memory.created_at,
+            updated_at=_NOW_PLUS_1_DAY,
+            source_message_count=20,
         )
+        await repository.save_many([updated_memory, channel_short_term_memory])
 
-        assert result is not None
-        assert result.scope == MemoryScope.THREAD
-        assert result.source_latest_message_ts is None
+        memories = await repository.find_all_by_scope(
+            MemoryScope.CHANNEL,
+            "C1234567890",
+        )
+        long_term = next(m for m in memories if m.memory_type == MemoryType.LONG_TERM)
+
+        assert len(memories) == 2
+        assert long_term.content == "Updated content"
+        assert long_term.source_message_count == 20
+
+    async def test_save_many_empty(
+        self,
+        repository: SQLiteMemoryRepository,
+    ) -> None:
+        """Test that saving an empty list is a no-op."""
+        await repository.save_many([])
+
+        memories = await repository.find_all_by_scope(
+            MemoryScope.CHANNEL,
+            "C1234567890",
+        )
+        assert memories == []
 
 
 class TestSQLiteMemoryRepositoryFindByScopeAndType:
     """Tests for find_by_scope_and_type method."""
 
+    @pytest.mark.parametrize("memory", _SAMPLE_MEMORIES, indirect=True)
     async def test_find_existing_memory(
         self,
         repository: SQLiteMemoryRepository,
-        channel_long_term_memory: Memory,
+        memory: Memory,
     ) -> None:
-        """Test finding an existing memory."""
-        await repository.save(channel_long_term_memory)
+        """Test finding an existing memory in each scope."""
+        await repository.save(memory)
 
         result = await repository.find_by_scope_and_type(
-            channel_long_term_memory.scope,
-            channel_long_term_memory.scope_id,
-            channel_long_term_memory.memory_type,
+            memory.scope,
+            memory.scope_id,
+            memory.memory_type,
         )
 
         assert result is not None
-        assert result.content == channel_long_term_memory.content
+        assert result.content == memory.content
 
     async def test_find_nonexistent_memory(
         self,
@@ -258,8 +304,9 @@ class TestSQLiteMemoryRepositoryFindByScopeAndType:
         channel_short_term_memory: Memory,
     ) -> None:
         """Test that different memory types are distinguished."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(channel_short_term_memory)
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory]
+        )
 
         long_term = await repository.find_by_scope_and_type(
             MemoryScope.CHANNEL,
@@ -288,8 +335,9 @@ class TestSQLiteMemoryRepositoryFindAllByScope:
         channel_short_term_memory: Memory,
     ) -> None:
         """Test finding multiple memories with same scope."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(channel_short_term_memory)
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory]
+        )
 
         memories = await repository.find_all_by_scope(
             MemoryScope.CHANNEL,
@@ -319,8 +367,7 @@ class TestSQLiteMemoryRepositoryFindAllByScope:
         workspace_memory: Memory,
     ) -> None:
         """Test that find_all_by_scope does not include other scopes."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(workspace_memory)
+        await repository.save_many([channel_long_term_memory, workspace_memory])
 
         channel_memories = await repository.find_all_by_scope(
             MemoryScope.CHANNEL,
@@ -334,31 +381,25 @@ class TestSQLiteMemoryRepositoryFindAllByScope:
 class TestSQLiteMemoryRepositoryDeleteByScopeAndType:
     """Tests for delete_by_scope_and_type method."""
 
+    @pytest.mark.parametrize("memory", _SAMPLE_MEMORIES, indirect=True)
     async def test_delete_existing_memory(
         self,
         repository: SQLiteMemoryRepository,
-        channel_long_term_memory: Memory,
+        memory: Memory,
     ) -> None:
-        """Test deleting an existing memory."""
-        await repository.save(channel_long_term_memory)
-
-        result = await repository.find_by_scope_and_type(
-            channel_long_term_memory.scope,
-            channel_long_term_memory.scope_id,
-            channel_long_term_memory.memory_type,
-        )
-        assert result is not None
+        """Test deleting an existing memory in each scope."""
+        await repository.save(memory)
 
         await repository.delete_by_scope_and_type(
-            channel_long_term_memory.scope,
-            channel_long_term_memory.scope_id,
-            channel_long_term_memory.memory_type,
+            memory.scope,
+            memory.scope_id,
+            memory.memory_type,
         )
 
         result = await repository.find_by_scope_and_type(
-            channel_long_term_memory.scope,
-            channel_long_term_memory.scope_id,
-            channel_long_term_memory.memory_type,
+            memory.scope,
+            memory.scope_id,
+            memory.memory_type,
         )
         assert result is None
 
@@ -380,8 +421,9 @@ class TestSQLiteMemoryRepositoryDeleteByScopeAndType:
         channel_short_term_memory: Memory,
     ) -> None:
         """Test that delete only removes the specified memory type."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(channel_short_term_memory)
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory]
+        )
 
         await repository.delete_by_scope_and_type(
             MemoryScope.CHANNEL,
@@ -404,6 +446,45 @@ class TestSQLiteMemoryRepositoryDeleteByScopeAndType:
         assert short_term is not None
 
 
+class TestSQLiteMemoryRepositoryPopByScopeAndType:
+    """Tests for pop_by_scope_and_type method."""
+
+    async def test_pop_existing_memory(
+        self,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+    ) -> None:
+        """Test that popping returns the deleted memory."""
+        await repository.save(channel_long_term_memory)
+
+        popped = await repository.pop_by_scope_and_type(
+            channel_long_term_memory.scope,
+            channel_long_term_memory.scope_id,
+            channel_long_term_memory.memory_type,
+        )
+
+        assert popped == channel_long_term_memory
+        result = await repository.find_by_scope_and_type(
+            channel_long_term_memory.scope,
+            channel_long_term_memory.scope_id,
+            channel_long_term_memory.memory_type,
+        )
+        assert result is None
+
+    async def test_pop_nonexistent_memory_returns_none(
+        self,
+        repository: SQLiteMemoryRepository,
+    ) -> None:
+        """Test that popping a nonexistent memory returns None."""
+        popped = await repository.pop_by_scope_and_type(
+            MemoryScope.CHANNEL,
+            "C_nonexistent",
+            MemoryType.LONG_TERM,
+        )
+
+        assert popped is None
+
+
 class TestSQLiteMemoryRepositoryDeleteByScope:
     """Tests for delete_by_scope method."""
 
@@ -414,8 +495,9 @@ class TestSQLiteMemoryRepositoryDeleteByScope:
         channel_short_term_memory: Memory,
     ) -> None:
         """Test deleting all memories in a scope."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(channel_short_term_memory)
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory]
+        )
 
         memories = await repository.find_all_by_scope(
             MemoryScope.CHANNEL,
@@ -441,8 +523,7 @@ class TestSQLiteMemoryRepositoryDeleteByScope:
         workspace_memory: Memory,
     ) -> None:
         """Test that delete_by_scope does not affect other scopes."""
-        await repository.save(channel_long_term_memory)
-        await repository.save(workspace_memory)
+        await repository.save_many([channel_long_term_memory, workspace_memory])
 
         await repository.delete_by_scope(
             MemoryScope.CHANNEL,
@@ -465,3 +546,144 @@ class TestSQLiteMemoryRepositoryDeleteByScope:
             MemoryScope.CHANNEL,
             "C_nonexistent",
         )
+
+
+class TestSQLiteMemoryRepositoryQueryCount:
+    """Tests pinning each repository operation to a single SQL statement."""
+
+    async def test_save_issues_single_statement(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+        count_queries,
+    ) -> None:
+        """Test that both insert and update go through one upsert statement."""
+        with count_queries(db_manager.get_engine()) as statements:
+            await repository.save(channel_long_term_memory)
+            await repository.save(channel_long_term_memory)
+
+        assert len(statements) == 2
+
+    async def test_find_by_scope_and_type_issues_single_statement(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        count_queries,
+    ) -> None:
+        """Test that find_by_scope_and_type issues a single SELECT."""
+        with count_queries(db_manager.get_engine()) as statements:
+            await repository.find_by_scope_and_type(
+                MemoryScope.CHANNEL,
+                "C1234567890",
+                MemoryType.LONG_TERM,
+            )
+
+        assert len(statements) == 1
+
+    async def test_delete_by_scope_and_type_issues_single_statement(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+        count_queries,
+    ) -> None:
+        """Test that delete_by_scope_and_type issues a single DELETE."""
+        await repository.save(channel_long_term_memory)
+
+        with count_queries(db_manager.get_engine()) as statements:
+            await repository.delete_by_scope_and_type(
+                MemoryScope.CHANNEL,
+                "C1234567890",
+                MemoryType.LONG_TERM,
+            )
+
+        assert len(statements) == 1
+
+    async def test_delete_by_scope_issues_single_statement(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+        channel_short_term_memory: Memory,
+        count_queries,
+    ) -> None:
+        """Test that delete_by_scope removes every row with one DELETE."""
+        await repository.save_many(
+            [channel_long_term_memory, channel_short_term_memory]
+        )
+
+        with count_queries(db_manager.get_engine()) as statements:
+            await repository.delete_by_scope(MemoryScope.CHANNEL, "C1234567890")
+
+        assert len(statements) == 1
+
+    async def test_pop_by_scope_and_type_issues_single_statement(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+        count_queries,
+    ) -> None:
+        """Test that pop_by_scope_and_type finds and deletes with one statement."""
+        await repository.save(channel_long_term_memory)
+
+        with count_queries(db_manager.get_engine()) as statements:
+            await repository.pop_by_scope_and_type(
+                MemoryScope.CHANNEL,
+                "C1234567890",
+                MemoryType.LONG_TERM,
+            )
+
+        assert len(statements) == 1
+
+
+class TestSQLiteMemoryRepositoryTimestampStorage:
+    """Tests for how memory timestamps are stored."""
+
+    async def test_timestamps_are_stored_as_integers(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        channel_long_term_memory: Memory,
+    ) -> None:
+        """Test that timestamps are stored as unix microseconds."""
+        await repository.save(channel_long_term_memory)
+
+        async with db_manager.get_session() as session:
+            result = await session.exec(
+                text("SELECT typeof(created_at), updated_at FROM memories")
+            )
+            row = result.one()
+
+        assert row[0] == "integer"
+        assert row[1] == int(channel_long_term_memory.updated_at.timestamp()) * 10**6
+
+    async def test_find_reads_legacy_text_timestamps(
+        self,
+        db_manager: DatabaseManager,
+        repository: SQLiteMemoryRepository,
+        now: datetime,
+    ) -> None:
+        """Test that rows written with ISO-8601 TEXT timestamps are still readable."""
+        async with db_manager.get_session() as session:
+            await session.exec(
+                text(
+                    "INSERT INTO memories "
+                    "(scope, scope_id, memory_type, content, created_at, "
+                    "updated_at, source_message_count) "
+                    "VALUES ('workspace', 'W1', 'long_term', 'Legacy', "
+                    "'2024-01-15 12:00:00.000000', '2024-01-15 12:00:00.000000', 1)"
+                )
+            )
+            await session.commit()
+
+        result = await repository.find_by_scope_and_type(
+            MemoryScope.WORKSPACE,
+            "W1",
+            MemoryType.LONG_TERM,
+        )
+
+        assert result is not None
+        assert result.created_at == now
+        assert result.updated_at == now
@@ -1,44 +1,31 @@
 """Tests for SQLiteUserRepository."""
 
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import nullcontext
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
 
 from myao2.domain.entities import User
 from myao2.infrastructure.persistence import SQLiteUserRepository
 
 
 @pytest.fixture
-async def engine() -> AsyncGenerator[AsyncEngine, None]:
-    """Create in-memory SQLite async engine."""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    yield engine
-    await engine.dispose()
+def repository(session_factory) -> SQLiteUserRepository:
+    """Create test repository."""
+    return SQLiteUserRepository(session_factory)
 
 
 @pytest.fixture
-def session_factory(engine: AsyncEngine):
-    """Create async session factory."""
-    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    @asynccontextmanager
-    async def get_session() -> AsyncGenerator[AsyncSession, None]:
-        async with factory() as session:
-            yield session
+async def scoped_repository(
+    session_factory,
+) -> AsyncGenerator[SQLiteUserRepository, None]:
+    """Create a repository whose operations all share one session.
 
-    return get_session
-
-
-@pytest.fixture
-def repository(session_factory) -> SQLiteUserRepository:
-    """Create test repository."""
-    return SQLiteUserRepository(session_factory)
+    The repository normally opens a new session per call; binding it to a
+    single session saves the checkout on every save/find within a test.
+    """
+    async with session_factory() as session:
+        yield SQLiteUserRepository(lambda: nullcontext(session))
 
 
 def create_test_user(
@@ -105,6 +92,45 @@ class TestSave:
         assert found.is_bot is True
 
 
+class TestSaveMany:
+    """save_many method tests."""
+
+    async def test_save_many_spans_multiple_chunks(
+        self, scoped_repository: SQLiteUserRepository
+    ) -> None:
+        """Test that more users than fit in one statement are all saved."""
+        await scoped_repository.save_many(
+            [create_test_user(id=f"U{i:04d}", name=f"User {i}") for i in range(600)]
+        )
+
+        assert await scoped_repository.find_by_id("U0000") is not None
+        assert await scoped_repository.find_by_id("U0599") is not None
+
+    async def test_save_many_updates_existing_user(
+        self, repository: SQLiteUserRepository
+    ) -> None:
+        """Test that save_many upserts users with an existing ID."""
+        await repository.save(create_test_user(id="U001", name="Original Name"))
+
+        await repository.save_many(
+            [
+                create_test_user(id="U001", name="Updated Name"),
+                create_test_user(id="U002", name="New User"),
+            ]
+        )
+
+        found = await repository.find_by_id("U001")
+        assert found is not None
+        assert found.name == "Updated Name"
+        assert await repository.find_by_id("U002") is not None
+
+    async def test_save_many_empty(self, repository: SQLiteUserRepository) -> None:
+        """Test that saving an empty list is a no-op."""
+        await repository.save_many([])
+
+        assert await repository.find_by_id("U001") is None
+
+
 class TestFindById:
     """find_by_id method tests."""
 
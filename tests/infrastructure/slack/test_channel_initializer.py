@@ -1,6 +1,7 @@
 """Tests for SlackChannelInitializer."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from typing import Any
 
 import pytest
 
@@ -8,268 +9,297 @@ from myao2.domain.entities import Channel
 from myao2.infrastructure.slack.channel_initializer import SlackChannelInitializer
 
 
+class FakeSlackClient:
+    """Records users_conversations calls and returns canned pages.
+
+    A page given as an exception is raised instead of returned.
+    """
+
+    def __init__(
+        self,
+        *pages: dict[str, Any] | Exception,
+        error: Exception | None = None,
+    ) -> None:
+        self.pages = list(pages) or [{"channels": []}]
+        self.error = error
+        self.calls: list[dict[str, Any]] = []
+
+    async def users_conversations(self, **kwargs: Any) -> dict[str, Any]:
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        page = self.pages[len(self.calls) - 1]
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+class FakeChannelRepository:
+    """In-memory ChannelRepository that records saves and deletes."""
+
+    def __init__(self, existing: list[Channel] | None = None) -> None:
+        self.existing = existing or []
+        self.saved: list[Channel] = []
+        self.save_batches: list[list[Channel]] = []
+        self.deleted: list[str] = []
+        self.delete_batches: list[list[str]] = []
+
+    async def save(self, channel: Channel) -> None:
+        self.saved.append(channel)
+
+    async def save_many(self, channels: list[Channel]) -> None:
+        self.save_batches.append(list(channels))
+        self.saved.extend(channels)
+
+    async def find_all(self) -> list[Channel]:
+        return self.existing
+
+    async def delete(self, channel_id: str) -> bool:
+        self.deleted.append(channel_id)
+        return True
+
+    async def delete_many(self, channel_ids: list[str]) -> int:
+        self.delete_batches.append(list(channel_ids))
+        self.deleted.extend(channel_ids)
+        return len(channel_ids)
+
+
+def channels_response(*channels: tuple[str, str]) -> dict[str, Any]:
+    """Build a users.conversations response from (id, name) pairs."""
+    return {"channels": [{"id": id, "name": name} for id, name in channels]}
+
+
+def make_initializer(
+    client: FakeSlackClient, repository: FakeChannelRepository
+) -> SlackChannelInitializer:
+    """Create an initializer wired to the fakes."""
+    return SlackChannelInitializer(
+        client=client,  # type: ignore[arg-type]
+        channel_repository=repository,  # type: ignore[arg-type]
+    )
+
+
+@pytest.fixture
+def channel_repository() -> FakeChannelRepository:
+    """Create an empty fake ChannelRepository."""
+    return FakeChannelRepository()
+
+
 class TestSlackChannelInitializer:
     """SlackChannelInitializer tests."""
 
     @pytest.fixture
-    def mock_client(self) -> MagicMock:
-        """Create mock Slack AsyncWebClient."""
-        client = MagicMock()
-        client.users_conversations = AsyncMock(
-            return_value={
-                "channels": [
-                    {"id": "C001", "name": "general"},
-                    {"id": "C002", "name": "random"},
-                    {"id": "C003", "name": "dev"},
-                ]
-            }
+    def client(self) -> FakeSlackClient:
+        """Create a fake Slack client returning three channels."""
+        return FakeSlackClient(
+            channels_response(("C001", "general"), ("C002", "random"), ("C003", "dev"))
         )
-        return client
-
-    @pytest.fixture
-    def mock_channel_repository(self) -> MagicMock:
-        """Create mock ChannelRepository."""
-        repo = MagicMock()
-        repo.save = AsyncMock()
-        return repo
 
     @pytest.fixture
     def initializer(
-        self, mock_client: MagicMock, mock_channel_repository: MagicMock
+        self, client: FakeSlackClient, channel_repository: FakeChannelRepository
     ) -> SlackChannelInitializer:
         """Create initializer instance."""
-        return SlackChannelInitializer(
-            client=mock_client,
-            channel_repository=mock_channel_repository,
-        )
+        return make_initializer(client, channel_repository)
 
     async def test_sync_channels_returns_channels(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
+        self, initializer: SlackChannelInitializer
     ) -> None:
         """Test sync_channels returns list of channels."""
         channels = await initializer.sync_channels()
 
-        assert len(channels) == 3
-        assert all(isinstance(ch, Channel) for ch in channels)
-        assert channels[0].id == "C001"
-        assert channels[0].name == "general"
-        assert channels[1].id == "C002"
-        assert channels[1].name == "random"
-        assert channels[2].id == "C003"
-        assert channels[2].name == "dev"
+        assert channels == [
+            Channel(id="C001", name="general"),
+            Channel(id="C002", name="random"),
+            Channel(id="C003", name="dev"),
+        ]
 
     async def test_sync_channels_calls_api_correctly(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
+        self, initializer: SlackChannelInitializer, client: FakeSlackClient
     ) -> None:
         """Test sync_channels calls Slack API with correct parameters."""
         await initializer.sync_channels()
 
-        mock_client.users_conversations.assert_called_once_with(
-            types="public_channel,private_channel"
-        )
-
-    async def test_sync_channels_saves_to_repository(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_channel_repository: MagicMock,
-    ) -> None:
-        """Test sync_channels saves each channel to repository."""
-        await initializer.sync_channels()
-
-        assert mock_channel_repository.save.call_count == 3
-        saved_channels = [
-            call.args[0] for call in mock_channel_repository.save.call_args_list
+        assert client.calls == [
+            {"types": "public_channel,private_channel", "limit": 1000}
         ]
-        assert saved_channels[0].id == "C001"
-        assert saved_channels[1].id == "C002"
-        assert saved_channels[2].id == "C003"
 
-    async def test_sync_channels_empty_response(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
+    async def test_sync_channels_follows_pagination(
+        self, channel_repository: FakeChannelRepository
     ) -> None:
-        """Test sync_channels handles empty channel list."""
-        mock_client.users_conversations = AsyncMock(return_value={"channels": []})
+        """Test sync_channels fetches every page using next_cursor."""
+        first_page = channels_response(("C001", "general"))
+        first_page["response_metadata"] = {"next_cursor": "page2"}
+        last_page = channels_response(("C002", "random"))
+        last_page["response_metadata"] = {"next_cursor": ""}
+        client = FakeSlackClient(first_page, last_page)
+        initializer = make_initializer(client, channel_repository)
 
         channels = await initializer.sync_channels()
 
-        assert channels == []
-        mock_channel_repository.save.assert_not_called()
+        assert [ch.id for ch in channels] == ["C001", "C002"]
+        assert [call.get("cursor") for call in client.calls] == [None, "page2"]
+        # Each page is saved as it arrives
+        batches = channel_repository.save_batches
+        assert [[ch.id for ch in batch] for batch in batches] == [["C001"], ["C002"]]
 
-    async def test_sync_channels_missing_channels_key(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
+    async def test_sync_channels_keeps_pages_saved_before_failure(
+        self, channel_repository: FakeChannelRepository
     ) -> None:
-        """Test sync_channels handles missing channels key in response."""
-        mock_client.users_conversations = AsyncMock(return_value={})
+        """Test that a failure on a later page keeps the earlier pages."""
+        first_page = channels_response(("C001", "general"))
+        first_page["response_metadata"] = {"next_cursor": "page2"}
+        client = FakeSlackClient(first_page, Exception("rate_limited"))
+        initializer = make_initializer(client, channel_repository)
 
         channels = await initializer.sync_channels()
 
-        assert channels == []
-        mock_channel_repository.save.assert_not_called()
+        assert channels == [Channel(id="C001", name="general")]
+        assert channel_repository.saved == [Channel(id="C001", name="general")]
 
-    async def test_sync_channels_api_error(
+    async def test_sync_channels_saves_to_repository(
         self,
         initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
+        channel_repository: FakeChannelRepository,
     ) -> None:
-        """Test sync_channels handles API errors gracefully."""
-        mock_client.users_conversations = AsyncMock(side_effect=Exception("API error"))
+        """Test sync_channels saves all channels to repository in one batch."""
+        await initializer.sync_channels()
 
+        assert len(channel_repository.save_batches) == 1
+        assert [ch.id for ch in channel_repository.saved] == ["C001", "C002", "C003"]
+
+    @pytest.mark.parametrize(
+        "client",
+        [
+            FakeSlackClient({"channels": []}),
+            FakeSlackClient({}),
+            FakeSlackClient(error=Exception("API error")),
+        ],
+        ids=["empty_response", "missing_channels_key", "api_error"],
+    )
+    async def test_sync_channels_returns_empty_without_saving(
+        self,
+        initializer: SlackChannelInitializer,
+        channel_repository: FakeChannelRepository,
+    ) -> None:
+        """Test sync_channels handles empty, malformed and failed responses."""
         channels = await initializer.sync_channels()
 
         assert channels == []
-        mock_channel_repository.save.assert_not_called()
+        assert channel_repository.saved == []
 
 
 class TestSyncChannelsWithCleanup:
     """sync_channels_with_cleanup method tests."""
 
-    @pytest.fixture
-    def mock_client(self) -> MagicMock:
-        """Create mock Slack AsyncWebClient."""
-        client = MagicMock()
-        client.users_conversations = AsyncMock(
-            return_value={
-                "channels": [
-                    {"id": "C001", "name": "general"},
-                ]
-            }
+    async def test_sync_with_cleanup_removes_channels_not_in_slack(self) -> None:
+        """Test that channels not in Slack are removed from DB."""
+        client = FakeSlackClient(channels_response(("C001", "general")))
+        repository = FakeChannelRepository(
+            [Channel(id="C001", name="general"), Channel(id="C002", name="old")]
         )
-        return client
+        initializer = make_initializer(client, repository)
 
-    @pytest.fixture
-    def mock_channel_repository(self) -> MagicMock:
-        """Create mock ChannelRepository."""
-        repo = MagicMock()
-        repo.save = AsyncMock()
-        repo.find_all = AsyncMock(return_value=[])
-        repo.delete = AsyncMock(return_value=True)
-        return repo
+        channels, removed = await initializer.sync_channels_with_cleanup()
 
-    @pytest.fixture
-    def initializer(
-        self, mock_client: MagicMock, mock_channel_repository: MagicMock
-    ) -> SlackChannelInitializer:
-        """Create initializer instance."""
-        return SlackChannelInitializer(
-            client=mock_client,
-            channel_repository=mock_channel_repository,
-        )
+        assert [ch.id for ch in channels] == ["C001"]
+        assert removed == ["C002"]
+        assert repository.deleted == ["C002"]
 
-    async def test_sync_with_cleanup_removes_channels_not_in_slack(
+    async def test_sync_with_cleanup_fetches_slack_and_db_concurrently(
         self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
     ) -> None:
-        """Test that channels not in Slack are removed from DB."""
-        # Slack returns only C001
-        mock_client.users_conversations = AsyncMock(
-            return_value={"channels": [{"id": "C001", "name": "general"}]}
-        )
-        # DB has C001 and C002
-        mock_channel_repository.find_all = AsyncMock(
-            return_value=[
-                Channel(id="C001", name="general"),
-                Channel(id="C002", name="old-channel"),
-            ]
+        """Test that the Slack call and the DB read overlap."""
+        started: list[str] = []
+
+        class SlowClient(FakeSlackClient):
+            async def users_conversations(self, **kwargs: Any) -> dict[str, Any]:
+                started.append("slack")
+                await asyncio.sleep(0)
+                # The DB read has started while the Slack call is in flight
+                assert "db" in started
+                return await super().users_conversations(**kwargs)
+
+        class SlowRepository(FakeChannelRepository):
+            async def find_all(self) -> list[Channel]:
+                started.append("db")
+                await asyncio.sleep(0)
+                return await super().find_all()
+
+        initializer = make_initializer(
+            SlowClient(channels_response(("C001", "general"))), SlowRepository()
         )
 
         channels, removed = await initializer.sync_channels_with_cleanup()
 
-        assert len(channels) == 1
-        assert channels[0].id == "C001"
-        assert removed == ["C002"]
-        mock_channel_repository.delete.assert_awaited_once_with("C002")
+        assert [ch.id for ch in channels] == ["C001"]
+        assert removed == []
 
-    async def test_sync_with_cleanup_saves_new_channels(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
-    ) -> None:
+    async def test_sync_with_cleanup_saves_new_channels(self) -> None:
         """Test that new channels from Slack are saved."""
-        mock_client.users_conversations = AsyncMock(
-            return_value={
-                "channels": [
-                    {"id": "C001", "name": "general"},
-                    {"id": "C002", "name": "new-channel"},
-                ]
-            }
-        )
-        mock_channel_repository.find_all = AsyncMock(
-            return_value=[Channel(id="C001", name="general")]
+        client = FakeSlackClient(
+            channels_response(("C001", "general"), ("C002", "new-channel"))
         )
+        repository = FakeChannelRepository([Channel(id="C001", name="general")])
+        initializer = make_initializer(client, repository)
 
         channels, removed = await initializer.sync_channels_with_cleanup()
 
         assert len(channels) == 2
         assert removed == []
-        assert mock_channel_repository.save.call_count == 2
+        # The unchanged C001 is not written again
+        assert [ch.id for ch in repository.saved] == ["C002"]
 
-    async def test_sync_with_cleanup_no_changes(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
-    ) -> None:
+    async def test_sync_with_cleanup_saves_renamed_channels(self) -> None:
+        """Test that channels renamed in Slack are updated."""
+        client = FakeSlackClient(channels_response(("C001", "renamed")))
+        repository = FakeChannelRepository([Channel(id="C001", name="general")])
+        initializer = make_initializer(client, repository)
+
+        await initializer.sync_channels_with_cleanup()
+
+        assert repository.saved == [Channel(id="C001", name="renamed")]
+
+    async def test_sync_with_cleanup_no_changes(self) -> None:
         """Test when Slack and DB are in sync."""
-        mock_client.users_conversations = AsyncMock(
-            return_value={"channels": [{"id": "C001", "name": "general"}]}
-        )
-        mock_channel_repository.find_all = AsyncMock(
-            return_value=[Channel(id="C001", name="general")]
-        )
+        client = FakeSlackClient(channels_response(("C001", "general")))
+        repository = FakeChannelRepository([Channel(id="C001", name="general")])
+        initializer = make_initializer(client, repository)
 
         channels, removed = await initializer.sync_channels_with_cleanup()
 
         assert len(channels) == 1
         assert removed == []
-        mock_channel_repository.delete.assert_not_awaited()
+        assert repository.deleted == []
+        assert repository.save_batches == []
 
-    async def test_sync_with_cleanup_removes_multiple_channels(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
-    ) -> None:
+    async def test_sync_with_cleanup_removes_multiple_channels(self) -> None:
         """Test removing multiple channels at once."""
-        mock_client.users_conversations = AsyncMock(return_value={"channels": []})
-        mock_channel_repository.find_all = AsyncMock(
-            return_value=[
+        client = FakeSlackClient({"channels": []})
+        repository = FakeChannelRepository(
+            [
                 Channel(id="C001", name="channel-1"),
                 Channel(id="C002", name="channel-2"),
                 Channel(id="C003", name="channel-3"),
             ]
         )
+        initializer = make_initializer(client, repository)
 
         channels, removed = await initializer.sync_channels_with_cleanup()
 
         assert channels == []
         assert set(removed) == {"C001", "C002", "C003"}
-        assert mock_channel_repository.delete.call_count == 3
+        assert len(repository.delete_batches) == 1
+        assert set(repository.deleted) == {"C001", "C002", "C003"}
 
-    async def test_sync_with_cleanup_api_error_returns_empty(
-        self,
-        initializer: SlackChannelInitializer,
-        mock_client: MagicMock,
-        mock_channel_repository: MagicMock,
-    ) -> None:
+    async def test_sync_with_cleanup_api_error_returns_empty(self) -> None:
         """Test that API errors return empty results."""
-        mock_client.users_conversations = AsyncMock(side_effect=Exception("API error"))
+        client = FakeSlackClient(error=Exception("API error"))
+        repository = FakeChannelRepository([Channel(id="C001", name="general")])
+        initializer = make_initializer(client, repository)
 
         channels, removed = await initializer.sync_channels_with_cleanup()
 
         assert channels == []
         assert removed == []
-        mock_channel_repository.delete.assert_not_awaited()
+        assert repository.deleted == []
@@ -1,7 +1,9 @@
 """Tests for SlackChannelMonitor."""
 
+import asyncio
+import inspect
 from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, MagicMock
+from typing import Any
 
 import pytest
 from slack_sdk.errors import SlackApiError
@@ -42,47 +44,100 @@ def create_slack_channel(
     }
 
 
+# Canned responses shared by the tests below. The monitor only reads them,
+# so they are built once at import instead of per test.
+USER_INFO_RESPONSE = {"user": {"id": "U123456", "name": "testuser", "is_bot": False}}
+
+CHANNELS_RESPONSE = {
+    "ok": True,
+    "channels": [
+        create_slack_channel(id="C001", name="general"),
+        create_slack_channel(id="C002", name="random"),
+    ],
+}
+
+# API returns newest first
+HISTORY_RESPONSE = {
+    "ok": True,
+    "messages": [
+        create_slack_message(ts="1234567890.000003", text="Third"),
+        create_slack_message(ts="1234567890.000002", text="Second"),
+        create_slack_message(ts="1234567890.000001", text="First"),
+    ],
+}
+
+# 1000 messages newest first around 1705320000, one distinct author each
+LARGE_HISTORY_RESPONSE = {
+    "ok": True,
+    "messages": [
+        create_slack_message(ts=f"{1705320000 + 500 - i}.000000", user=f"U{i}")
+        for i in range(1000)
+    ],
+}
+
+
+class FakeEndpoint:
+    """Async stand-in for one Slack Web API method.
+
+    Records the keyword arguments of each call and returns return_value,
+    unless side_effect is set to an exception to raise or a (sync or async)
+    callable to delegate to.
+    """
+
+    def __init__(self, return_value: Any = None) -> None:
+        self.return_value = return_value
+        self.side_effect: Any = None
+        self.calls: list[dict[str, Any]] = []
+
+    async def __call__(self, **kwargs: Any) -> Any:
+        self.calls.append(kwargs)
+        if isinstance(self.side_effect, BaseException):
+            raise self.side_effect
+        if self.side_effect is not None:
+            result = self.side_effect(**kwargs)
+            return await result if inspect.isawaitable(result) else result
+        return self.return_value
+
+    @property
+    def await_count(self) -> int:
+        return len(self.calls)
+
+
+class FakeSlackClient:
+    """The subset of AsyncWebClient used by SlackChannelMonitor."""
+
+    def __init__(self) -> None:
+        self.users_info = FakeEndpoint(USER_INFO_RESPONSE)
+        self.users_conversations = FakeEndpoint()
+        self.conversations_history = FakeEndpoint()
+        self.conversations_replies = FakeEndpoint()
+
+
 class TestSlackChannelMonitor:
     """SlackChannelMonitor tests."""
 
     @pytest.fixture
-    def mock_client(self) -> MagicMock:
-        """Create mock Slack AsyncWebClient."""
-        client = MagicMock()
-        client.users_info = AsyncMock(
-            return_value={
-                "user": {
-                    "id": "U123456",
-                    "name": "testuser",
-                    "is_bot": False,
-                }
-            }
-        )
-        client.users_conversations = AsyncMock()
-        client.conversations_history = AsyncMock()
-        client.conversations_replies = AsyncMock()
-        return client
+    def client(self) -> FakeSlackClient:
+        """Create fake Slack AsyncWebClient."""
+        return FakeSlackClient()
 
     @pytest.fixture
-    def monitor(self, mock_client: MagicMock) -> SlackChannelMonitor:
+    def monitor(self, client: FakeSlackClient) -> SlackChannelMonitor:
         """Create monitor instance."""
-        return SlackChannelMonitor(client=mock_client, bot_user_id="UBOT123")
+        return SlackChannelMonitor(
+            client=client,  # type: ignore[arg-type]
+            bot_user_id="UBOT123",
+        )
 
 
 class TestGetChannels(TestSlackChannelMonitor):
     """Tests for get_channels."""
 
     async def test_get_channels_with_channels(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test get_channels with channels present."""
-        mock_client.users_conversations.return_value = {
-            "ok": True,
-            "channels": [
-                create_slack_channel(id="C001", name="general"),
-                create_slack_channel(id="C002", name="random"),
-            ],
-        }
+        client.users_conversations.return_value = CHANNELS_RESPONSE
 
         channels = await monitor.get_channels()
 
@@ -93,15 +148,15 @@ class TestGetChannels(TestSlackChannelMonitor):
         assert channels[1].id == "C002"
         assert channels[1].name == "random"
 
-        mock_client.users_conversations.assert_awaited_once_with(
-            types="public_channel,private_channel",
-        )
+        assert client.users_conversations.calls == [
+            {"types": "public_channel,private_channel"}
+        ]
 
     async def test_get_channels_empty(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test get_channels with no channels."""
-        mock_client.users_conversations.return_value = {
+        client.users_conversations.return_value = {
             "ok": True,
             "channels": [],
         }
@@ -111,10 +166,10 @@ class TestGetChannels(TestSlackChannelMonitor):
         assert channels == []
 
     async def test_get_channels_api_error_returns_empty(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that API errors return empty list."""
-        mock_client.users_conversations.side_effect = SlackApiError(
+        client.users_conversations.side_effect = SlackApiError(
             message="invalid_auth",
             response={"error": "invalid_auth"},
         )
@@ -123,23 +178,64 @@ class TestGetChannels(TestSlackChannelMonitor):
 
         assert channels == []
 
+    async def test_get_channels_served_from_cache(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that repeated calls within the TTL reuse the first response."""
+        client.users_conversations.return_value = CHANNELS_RESPONSE
+
+        first = await monitor.get_channels()
+        second = await monitor.get_channels()
+
+        assert first == second
+        assert client.users_conversations.await_count == 1
+
+    async def test_get_channels_concurrent_misses_share_one_call(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that concurrent callers on an empty cache fetch only once."""
+        client.users_conversations.return_value = CHANNELS_RESPONSE
+
+        results = await asyncio.gather(*(monitor.get_channels() for _ in range(3)))
+
+        assert all(len(channels) == 2 for channels in results)
+        assert client.users_conversations.await_count == 1
+
+    async def test_invalidate_channels_cache_forces_refetch(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that invalidation makes the next call hit the API."""
+        client.users_conversations.return_value = CHANNELS_RESPONSE
+        await monitor.get_channels()
+
+        monitor.invalidate_channels_cache()
+        await monitor.get_channels()
+
+        assert client.users_conversations.await_count == 2
+
+    async def test_get_channels_error_is_not_cached(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that a failed call is retried on the next call."""
+        client.users_conversations.side_effect = SlackApiError(
+            message="token_revoked", response={"error": "token_revoked"}
+        )
+        assert await monitor.get_channels() == []
+
+        client.users_conversations.side_effect = None
+        client.users_conversations.return_value = CHANNELS_RESPONSE
+
+        assert len(await monitor.get_channels()) == 2
+
 
 class TestGetRecentMessages(TestSlackChannelMonitor):
     """Tests for get_recent_messages."""
 
     async def test_get_recent_messages_basic(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test basic message retrieval."""
-        # API returns newest first
-        mock_client.conversations_history.return_value = {
-            "ok": True,
-            "messages": [
-                create_slack_message(ts="1234567890.000003", text="Third"),
-                create_slack_message(ts="1234567890.000002", text="Second"),
-                create_slack_message(ts="1234567890.000001", text="First"),
-            ],
-        }
+        client.conversations_history.return_value = HISTORY_RESPONSE
 
         messages = await monitor.get_recent_messages(channel_id="C123456")
 
@@ -150,37 +246,30 @@ class TestGetRecentMessages(TestSlackChannelMonitor):
         assert messages[1].text == "Second"
         assert messages[2].text == "First"
 
-        mock_client.conversations_history.assert_awaited_once_with(
-            channel="C123456",
-            limit=20,
-        )
+        assert client.conversations_history.calls == [
+            {"channel": "C123456", "limit": 20}
+        ]
 
     async def test_get_recent_messages_with_limit(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test message retrieval with custom limit."""
-        mock_client.conversations_history.return_value = {
-            "ok": True,
-            "messages": [
-                create_slack_message(ts="1234567890.000001", text="First"),
-            ],
-        }
+        client.conversations_history.return_value = HISTORY_RESPONSE
 
         await monitor.get_recent_messages(channel_id="C123456", limit=10)
 
-        mock_client.conversations_history.assert_awaited_once_with(
-            channel="C123456",
-            limit=10,
-        )
+        assert client.conversations_history.calls == [
+            {"channel": "C123456", "limit": 10}
+        ]
 
     async def test_get_recent_messages_with_since(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test message retrieval with since filter."""
         since = datetime(2024, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
 
         # API returns newest first, messages older than since should be filtered
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 # timestamp 1705320000 = 2024-01-15 12:00:00 UTC
@@ -195,11 +284,28 @@ class TestGetRecentMessages(TestSlackChannelMonitor):
         assert len(messages) == 1
         assert messages[0].text == "After since"
 
+    async def test_get_recent_messages_since_keeps_order_and_skips_lookups(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that filtered-out messages are never resolved to users."""
+        since = datetime.fromtimestamp(1705320000, tz=timezone.utc)
+        client.conversations_history.return_value = LARGE_HISTORY_RESPONSE
+
+        messages = await monitor.get_recent_messages(
+            channel_id="C123456", since=since, limit=1000
+        )
+
+        # Messages at or before since are dropped
+        assert [m.id for m in messages] == [
+            f"{1705320000 + 500 - i}.000000" for i in range(500)
+        ]
+        assert client.users_info.await_count == 500
+
     async def test_get_recent_messages_api_error_returns_empty(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that API errors return empty list."""
-        mock_client.conversations_history.side_effect = SlackApiError(
+        client.conversations_history.side_effect = SlackApiError(
             message="channel_not_found",
             response={"error": "channel_not_found"},
         )
@@ -209,10 +315,10 @@ class TestGetRecentMessages(TestSlackChannelMonitor):
         assert messages == []
 
     async def test_get_recent_messages_excludes_subtypes(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that system messages are excluded."""
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(ts="1234567890.000003", text="Normal"),
@@ -234,19 +340,19 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
     """Tests for get_unreplied_threads."""
 
     async def test_unreplied_thread_after_wait_time(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that threads past wait time and not replied are returned."""
         now = datetime.now(timezone.utc)
         old_ts = (now - timedelta(seconds=400)).timestamp()
 
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(ts=f"{old_ts}", user="U111", text="Hello?"),
             ],
         }
-        mock_client.users_info.return_value = {
+        client.users_info.return_value = {
             "user": {"id": "U111", "name": "user1", "is_bot": False}
         }
 
@@ -257,21 +363,23 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
         # Returns None for top-level unreplied
         assert len(threads) == 1
         assert threads[0] is None
+        # Authors are not needed to decide whether the bot replied
+        assert client.users_info.calls == []
 
     async def test_message_within_wait_time_not_returned(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that messages within wait time are not returned."""
         now = datetime.now(timezone.utc)
         recent_ts = (now - timedelta(seconds=100)).timestamp()
 
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(ts=f"{recent_ts}", user="U111", text="Hello?"),
             ],
         }
-        mock_client.users_info.return_value = {
+        client.users_info.return_value = {
             "user": {"id": "U111", "name": "user1", "is_bot": False}
         }
 
@@ -280,15 +388,16 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
         )
 
         assert len(threads) == 0
+        assert client.users_info.calls == []
 
     async def test_bot_own_message_not_returned(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that bot's own messages are not returned."""
         now = datetime.now(timezone.utc)
         old_ts = (now - timedelta(seconds=400)).timestamp()
 
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(
@@ -296,7 +405,7 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
                 ),
             ],
         }
-        mock_client.users_info.return_value = {
+        client.users_info.return_value = {
             "user": {"id": "UBOT123", "name": "myao", "is_bot": True}
         }
 
@@ -305,16 +414,17 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
         )
 
         assert len(threads) == 0
+        assert client.users_info.calls == []
 
     async def test_message_with_bot_reply_not_returned(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that messages already replied by bot are not returned."""
         now = datetime.now(timezone.utc)
         old_ts = (now - timedelta(seconds=400)).timestamp()
         reply_ts = (now - timedelta(seconds=200)).timestamp()
 
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(ts=f"{reply_ts}", user="UBOT123", text="Reply!"),
@@ -328,7 +438,7 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
                 return {"user": {"id": "UBOT123", "name": "myao", "is_bot": True}}
             return {"user": {"id": user_id, "name": "user", "is_bot": False}}
 
-        mock_client.users_info.side_effect = user_info_side_effect
+        client.users_info.side_effect = user_info_side_effect
 
         threads = await monitor.get_unreplied_threads(
             channel_id="C123456", min_wait_seconds=300
@@ -338,14 +448,14 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
         assert len(threads) == 0
 
     async def test_thread_message_with_bot_reply_not_returned(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that thread messages with bot reply are not returned."""
         now = datetime.now(timezone.utc)
         parent_ts = (now - timedelta(seconds=400)).timestamp()
         parent_ts_str = f"{parent_ts}"
 
-        mock_client.conversations_history.return_value = {
+        client.conversations_history.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(
@@ -359,7 +469,7 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
 
         # Bot replied in the thread
         reply_ts = (now - timedelta(seconds=200)).timestamp()
-        mock_client.conversations_replies.return_value = {
+        client.conversations_replies.return_value = {
             "ok": True,
             "messages": [
                 create_slack_message(
@@ -383,7 +493,7 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
                 return {"user": {"id": "UBOT123", "name": "myao", "is_bot": True}}
             return {"user": {"id": user_id, "name": "user", "is_bot": False}}
 
-        mock_client.users_info.side_effect = user_info_side_effect
+        client.users_info.side_effect = user_info_side_effect
 
         threads = await monitor.get_unreplied_threads(
             channel_id="C123456", min_wait_seconds=300
@@ -391,11 +501,77 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
 
         assert len(threads) == 0
 
+    async def test_thread_replies_fetched_once_per_thread(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that several candidates in one thread share a replies call."""
+        now = datetime.now(timezone.utc)
+        parent_ts = f"{(now - timedelta(seconds=600)).timestamp()}"
+        later_ts = f"{(now - timedelta(seconds=400)).timestamp()}"
+        client.conversations_history.return_value = {
+            "ok": True,
+            "messages": [
+                create_slack_message(ts=later_ts, user="U222", thread_ts=parent_ts),
+                create_slack_message(ts=parent_ts, user="U111", thread_ts=parent_ts),
+            ],
+        }
+        # The bot replied after the parent but before the later message
+        bot_ts = f"{(now - timedelta(seconds=500)).timestamp()}"
+        client.conversations_replies.return_value = {
+            "messages": [create_slack_message(ts=bot_ts, user="UBOT123")]
+        }
+
+        threads = await monitor.get_unreplied_threads(
+            channel_id="C123456", min_wait_seconds=300
+        )
+
+        assert threads == [parent_ts]
+        assert client.conversations_replies.await_count == 1
+
+    async def test_thread_replies_are_fetched_concurrently(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that replies for several threads are fetched in parallel."""
+        now = datetime.now(timezone.utc)
+        thread_ts_list = [
+            f"{(now - timedelta(seconds=400 + i)).timestamp()}" for i in range(3)
+        ]
+        client.conversations_history.return_value = {
+            "ok": True,
+            "messages": [
+                create_slack_message(ts=ts, user="U111", thread_ts=ts)
+                for ts in thread_ts_list
+            ],
+        }
+        in_flight = 0
+        max_in_flight = 0
+
+        async def replies(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            # Only the first thread has a bot reply
+            if kwargs["ts"] == thread_ts_list[0]:
+                reply_ts = f"{(now - timedelta(seconds=10)).timestamp()}"
+                return {"messages": [create_slack_message(ts=reply_ts, user="UBOT123")]}
+            return {"messages": []}
+
+        client.conversations_replies.side_effect = replies
+
+        threads = await monitor.get_unreplied_threads(
+            channel_id="C123456", min_wait_seconds=300
+        )
+
+        assert max_in_flight == 3
+        assert set(threads) == set(thread_ts_list[1:])
+
     async def test_api_error_returns_empty(
-        self, monitor: SlackChannelMonitor, mock_client: MagicMock
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
     ) -> None:
         """Test that API errors return empty list."""
-        mock_client.conversations_history.side_effect = SlackApiError(
+        client.conversations_history.side_effect = SlackApiError(
             message="channel_not_found",
             response={"error": "channel_not_found"},
         )
@@ -405,3 +581,59 @@ class TestGetUnrepliedThreads(TestSlackChannelMonitor):
         )
 
         assert threads == []
+
+
+class TestUserInfoCache(TestSlackChannelMonitor):
+    """Tests for the users.info cache."""
+
+    async def test_same_user_looked_up_once(
+        self, monitor: SlackChannelMonitor, client: FakeSlackClient
+    ) -> None:
+        """Test that repeated messages by one user reuse the cached lookup."""
+        client.conversations_history.return_value = {
+            "ok": True,
+            "messages": [
+                create_slack_message(ts=f"1234567890.00000{i}") for i in range(5)
+            ],
+        }
+
+        await monitor.get_recent_messages(channel_id="C123456")
+        await monitor.get_recent_messages(channel_id="C123456")
+
+        assert client.users_info.await_count == 1
+
+    async def test_expired_entry_is_refetched(self, client: FakeSlackClient) -> None:
+        """Test that entries older than the TTL trigger a new lookup."""
+        monitor = SlackChannelMonitor(
+            client=client,  # type: ignore[arg-type]
+            bot_user_id="UBOT123",
+            user_cache_ttl=0,
+        )
+        client.conversations_history.return_value = {
+            "ok": True,
+            "messages": [create_slack_message()],
+        }
+
+        await monitor.get_recent_messages(channel_id="C123456")
+        await monitor.get_recent_messages(channel_id="C123456")
+
+        assert client.users_info.await_count == 2
+
+    async def test_api_error_invalidates_entry(self, client: FakeSlackClient) -> None:
+        """Test that a SlackApiError evicts the user and the next call retries."""
+        monitor = SlackChannelMonitor(
+            client=client,  # type: ignore[arg-type]
+            bot_user_id="UBOT123",
+            user_cache_ttl=0,
+        )
+        client.conversations_history.return_value = {
+            "ok": True,
+            "messages": [create_slack_message()],
+        }
+        await monitor.get_recent_messages(channel_id="C123456")
+        client.users_info.side_effect = SlackApiError(
+            message="invalid_auth", response={"error": "invalid_auth"}
+        )
+
+        assert await monitor.get_recent_messages(channel_id="C123456") == []
+        assert monitor._user_cache == {}
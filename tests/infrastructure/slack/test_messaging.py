@@ -1,6 +1,7 @@
 """Tests for SlackMessagingService."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from typing import Any
 
 import pytest
 from slack_sdk.errors import SlackApiError
@@ -9,24 +10,54 @@ from myao2.domain.exceptions import ChannelNotAccessibleError
 from myao2.infrastructure.slack import SlackMessagingService
 
 
+def slack_api_error(error_code: str) -> SlackApiError:
+    """Create a SlackApiError carrying the given error code."""
+    return SlackApiError(message=error_code, response={"error": error_code})
+
+
+# Errors are plain values, so each is built once at import
+CHANNEL_NOT_ACCESSIBLE_ERRORS = {
+    error_code: slack_api_error(error_code)
+    for error_code in ("not_in_channel", "channel_not_found", "is_archived")
+}
+RATE_LIMITED_ERROR = slack_api_error("rate_limited")
+
+
+class FakeSlackClient:
+    """Records chat_postMessage calls and counts auth_test calls."""
+
+    def __init__(self) -> None:
+        self.posted: list[dict[str, Any]] = []
+        self.post_error: Exception | None = None
+        self.auth_test_calls = 0
+
+    async def chat_postMessage(self, **kwargs: Any) -> None:
+        self.posted.append(kwargs)
+        if self.post_error is not None:
+            raise self.post_error
+
+    async def auth_test(self) -> dict[str, str]:
+        self.auth_test_calls += 1
+        # Yield like a real request so concurrent callers can overlap
+        await asyncio.sleep(0)
+        return {"user_id": "UBOT123"}
+
+
 class TestSlackMessagingService:
     """SlackMessagingService tests."""
 
     @pytest.fixture
-    def mock_client(self) -> MagicMock:
-        """Create mock Slack AsyncWebClient."""
-        client = MagicMock()
-        client.chat_postMessage = AsyncMock()
-        client.auth_test = AsyncMock(return_value={"user_id": "UBOT123"})
-        return client
+    def client(self) -> FakeSlackClient:
+        """Create fake Slack AsyncWebClient."""
+        return FakeSlackClient()
 
     @pytest.fixture
-    def service(self, mock_client: MagicMock) -> SlackMessagingService:
+    def service(self, client: FakeSlackClient) -> SlackMessagingService:
         """Create service instance."""
-        return SlackMessagingService(client=mock_client)
+        return SlackMessagingService(client=client)  # type: ignore[arg-type]
 
     async def test_send_message_to_channel(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        self, service: SlackMessagingService, client: FakeSlackClient
     ) -> None:
         """Test sending message to channel."""
         await service.send_message(
@@ -34,14 +65,16 @@ class TestSlackMessagingService:
             text="Hello, world!",
         )
 
-        mock_client.chat_postMessage.assert_awaited_once_with(
-            channel="C123456",
-            text="Hello, world!",
-            thread_ts=None,
-        )
+        assert client.posted == [
+            {
+                "channel": "C123456",
+                "text": "Hello, world!",
+                "thread_ts": None,
+            }
+        ]
 
     async def test_send_message_to_thread(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        self, service: SlackMessagingService, client: FakeSlackClient
     ) -> None:
         """Test sending message to thread."""
         await service.send_message(
@@ -50,54 +83,20 @@ class TestSlackMessagingService:
             thread_ts="1234567890.123456",
         )
 
-        mock_client.chat_postMessage.assert_awaited_once_with(
-            channel="C123456",
-            text="Thread reply",
-            thread_ts="1234567890.123456",
-        )
-
-    async def test_send_message_not_in_channel_raises_channel_not_accessible(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        assert client.posted == [
+            {
+                "channel": "C123456",
+                "text": "Thread reply",
+                "thread_ts": "1234567890.123456",
+            }
+        ]
+
+    @pytest.mark.parametrize("error_code", list(CHANNEL_NOT_ACCESSIBLE_ERRORS))
+    async def test_send_message_inaccessible_channel_raises_channel_not_accessible(
+        self, service: SlackMessagingService, client: FakeSlackClient, error_code: str
     ) -> None:
-        """Test that not_in_channel error is converted to ChannelNotAccessibleError."""
-        mock_client.chat_postMessage.side_effect = SlackApiError(
-            message="not_in_channel",
-            response={"error": "not_in_channel"},
-        )
-
-        with pytest.raises(ChannelNotAccessibleError) as exc_info:
-            await service.send_message(
-                channel_id="C123456",
-                text="Hello",
-            )
-
-        assert exc_info.value.channel_id == "C123456"
-
-    async def test_send_message_channel_not_found_raises_channel_not_accessible(
-        self, service: SlackMessagingService, mock_client: MagicMock
-    ) -> None:
-        """Test channel_not_found converts to ChannelNotAccessibleError."""
-        mock_client.chat_postMessage.side_effect = SlackApiError(
-            message="channel_not_found",
-            response={"error": "channel_not_found"},
-        )
-
-        with pytest.raises(ChannelNotAccessibleError) as exc_info:
-            await service.send_message(
-                channel_id="C123456",
-                text="Hello",
-            )
-
-        assert exc_info.value.channel_id == "C123456"
-
-    async def test_send_message_is_archived_raises_channel_not_accessible(
-        self, service: SlackMessagingService, mock_client: MagicMock
-    ) -> None:
-        """Test that is_archived error is converted to ChannelNotAccessibleError."""
-        mock_client.chat_postMessage.side_effect = SlackApiError(
-            message="is_archived",
-            response={"error": "is_archived"},
-        )
+        """Test that channel access errors become ChannelNotAccessibleError."""
+        client.post_error = CHANNEL_NOT_ACCESSIBLE_ERRORS[error_code]
 
         with pytest.raises(ChannelNotAccessibleError) as exc_info:
             await service.send_message(
@@ -108,13 +107,10 @@ class TestSlackMessagingService:
         assert exc_info.value.channel_id == "C123456"
 
     async def test_send_message_other_api_error_propagated(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        self, service: SlackMessagingService, client: FakeSlackClient
     ) -> None:
         """Test that other API errors are propagated as SlackApiError."""
-        mock_client.chat_postMessage.side_effect = SlackApiError(
-            message="rate_limited",
-            response={"error": "rate_limited"},
-        )
+        client.post_error = RATE_LIMITED_ERROR
 
         with pytest.raises(SlackApiError):
             await service.send_message(
@@ -123,19 +119,30 @@ class TestSlackMessagingService:
             )
 
     async def test_get_bot_user_id(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        self, service: SlackMessagingService, client: FakeSlackClient
     ) -> None:
         """Test getting bot user ID."""
         bot_id = await service.get_bot_user_id()
 
         assert bot_id == "UBOT123"
-        mock_client.auth_test.assert_awaited_once()
+        assert client.auth_test_calls == 1
 
     async def test_get_bot_user_id_cached(
-        self, service: SlackMessagingService, mock_client: MagicMock
+        self, service: SlackMessagingService, client: FakeSlackClient
     ) -> None:
         """Test that bot user ID is cached."""
         await service.get_bot_user_id()
         await service.get_bot_user_id()
 
-        mock_client.auth_test.assert_awaited_once()
+        assert client.auth_test_calls == 1
+
+    async def test_get_bot_user_id_single_flight(
+        self, service: SlackMessagingService, client: FakeSlackClient
+    ) -> None:
+        """Test that concurrent first calls share one auth_test request."""
+        bot_ids = await asyncio.gather(
+            service.get_bot_user_id(), service.get_bot_user_id()
+        )
+
+        assert bot_ids == ["UBOT123", "UBOT123"]
+        assert client.auth_test_calls == 1
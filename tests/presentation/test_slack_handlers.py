@@ -1,74 +1,172 @@
 """Tests for Slack event handlers."""
 
+import logging
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from myao2.infrastructure.events.queue import EventQueue
+from myao2.domain.entities import Channel, Event, Message, User
 from myao2.presentation.slack_handlers import register_handlers
 
+BOT_USER_ID = "U_BOT_123"
+
+# Canned Slack events. The handlers only read them, so they are built once.
+BOT_LEFT_EVENT = {
+    "type": "member_left_channel",
+    "user": BOT_USER_ID,
+    "channel": "C123456",
+}
+
+OTHER_USER_LEFT_EVENT = {
+    "type": "member_left_channel",
+    "user": "U_OTHER_USER",  # Not the bot
+    "channel": "C123456",
+}
+
+UNKNOWN_CHANNEL_MENTION_EVENT = {
+    "type": "message",
+    "ts": "1234567890.123456",
+    "channel": "C_UNKNOWN",
+    "text": f"Hello <@{BOT_USER_ID}>",
+    "user": "U_USER",
+}
+
+KNOWN_CHANNEL_MESSAGE_EVENT = {
+    "type": "message",
+    "ts": "1234567890.123456",
+    "channel": "C_KNOWN",
+    "text": "Hello",
+    "user": "U_USER",
+}
+
+MESSAGE_DELETED_EVENT = {
+    "type": "message",
+    "subtype": "message_deleted",
+    "deleted_ts": "1234567890.123456",
+    "channel": "C_ANY",
+}
+
+
+class FakeEventQueue:
+    """Records enqueued events."""
+
+    def __init__(self) -> None:
+        self.enqueued: list[Event] = []
+
+    async def enqueue(self, event: Event, delay: float | None = None) -> None:
+        self.enqueued.append(event)
+
+
+class FakeEventAdapter:
+    """Returns a canned message and records the converted events."""
+
+    def __init__(self) -> None:
+        self.message: Message | None = None
+        self.converted: list[dict[str, Any]] = []
+
+    async def to_message(self, event: dict[str, Any]) -> Message | None:
+        self.converted.append(event)
+        return self.message
+
+
+class FakeMessageRepository:
+    """Records saved and deleted messages."""
+
+    def __init__(self) -> None:
+        self.saved: list[Message] = []
+        self.deleted: list[dict[str, str]] = []
+
+    async def save(self, message: Message) -> None:
+        self.saved.append(message)
+
+    async def delete(self, message_id: str, channel_id: str) -> None:
+        self.deleted.append({"message_id": message_id, "channel_id": channel_id})
+
+
+class FakeChannelRepository:
+    """Serves one known channel and records lookups and deletes."""
+
+    def __init__(self) -> None:
+        self.channel: Channel | None = None
+        self.delete_error: Exception | None = None
+        self.looked_up: list[str] = []
+        self.deleted: list[str] = []
+
+    async def find_by_id(self, channel_id: str) -> Channel | None:
+        self.looked_up.append(channel_id)
+        return self.channel
+
+    async def delete(self, channel_id: str) -> bool:
+        self.deleted.append(channel_id)
+        if self.delete_error is not None:
+            raise self.delete_error
+        return True
+
 
 @pytest.fixture
-def mock_event_queue() -> AsyncMock:
-    """Create a mock EventQueue."""
-    return AsyncMock(spec=EventQueue)
+def event_queue() -> FakeEventQueue:
+    """Create a fake EventQueue."""
+    return FakeEventQueue()
 
 
 @pytest.fixture
-def mock_event_adapter() -> AsyncMock:
-    """Create a mock SlackEventAdapter."""
-    return AsyncMock()
+def event_adapter() -> FakeEventAdapter:
+    """Create a fake SlackEventAdapter."""
+    return FakeEventAdapter()
 
 
 @pytest.fixture
-def mock_message_repository() -> AsyncMock:
-    """Create a mock MessageRepository."""
-    return AsyncMock()
+def message_repository() -> FakeMessageRepository:
+    """Create a fake MessageRepository."""
+    return FakeMessageRepository()
 
 
 @pytest.fixture
-def mock_channel_repository() -> AsyncMock:
-    """Create a mock ChannelRepository."""
-    mock = AsyncMock()
-    mock.delete = AsyncMock(return_value=True)
-    return mock
+def channel_repository() -> FakeChannelRepository:
+    """Create a fake ChannelRepository."""
+    return FakeChannelRepository()
 
 
 @pytest.fixture
 def bot_user_id() -> str:
     """Bot user ID for testing."""
-    return "U_BOT_123"
+    return BOT_USER_ID
+
+
+def capture_event(handlers: dict[str, Any], event_type: str) -> Callable:
+    """Stand-in for AsyncApp.event that records handlers by event type."""
+
+    def decorator(func: Callable) -> Callable:
+        handlers[event_type] = func
+        return func
+
+    return decorator
 
 
 @pytest.fixture
 def registered_handlers(
-    mock_event_queue: AsyncMock,
-    mock_event_adapter: AsyncMock,
-    mock_message_repository: AsyncMock,
-    mock_channel_repository: AsyncMock,
+    event_queue: FakeEventQueue,
+    event_adapter: FakeEventAdapter,
+    message_repository: FakeMessageRepository,
+    channel_repository: FakeChannelRepository,
     bot_user_id: str,
 ) -> dict[str, Any]:
     """Register handlers and return captured handler dict."""
     handlers: dict[str, Any] = {}
-    mock_app = Mock()
-
-    def capture_event(event_type: str):
-        def decorator(func):
-            handlers[event_type] = func
-            return func
-
-        return decorator
-
-    mock_app.event = capture_event
+    # register_handlers only uses app.event, so a namespace is enough
+    app = SimpleNamespace(event=partial(capture_event, handlers))
 
     register_handlers(
-        mock_app,
-        mock_event_queue,
-        mock_event_adapter,
+        app,  # type: ignore[arg-type]
+        event_queue,  # type: ignore[arg-type]
+        event_adapter,  # type: ignore[arg-type]
         bot_user_id,
-        mock_message_repository,
-        mock_channel_repository,
+        message_repository,  # type: ignore[arg-type]
+        channel_repository,  # type: ignore[arg-type]
     )
 
     return handlers
@@ -80,8 +178,7 @@ class TestMemberLeftChannelHandler:
     async def test_bot_leaving_channel_removes_from_db(
         self,
         registered_handlers: dict[str, Any],
-        mock_channel_repository: AsyncMock,
-        bot_user_id: str,
+        channel_repository: FakeChannelRepository,
     ) -> None:
         """Test that bot leaving a channel removes it from DB."""
         # Verify member_left_channel handler was registered
@@ -89,78 +186,37 @@ class TestMemberLeftChannelHandler:
 
         # Call the handler with bot leaving
         handler = registered_handlers["member_left_channel"]
-        event = {
-            "type": "member_left_channel",
-            "user": bot_user_id,
-            "channel": "C123456",
-        }
 
-        await handler(event)
+        await handler(BOT_LEFT_EVENT)
 
-        mock_channel_repository.delete.assert_awaited_once_with("C123456")
+        assert channel_repository.deleted == ["C123456"]
 
     async def test_other_user_leaving_channel_does_nothing(
         self,
         registered_handlers: dict[str, Any],
-        mock_channel_repository: AsyncMock,
+        channel_repository: FakeChannelRepository,
     ) -> None:
         """Test that other users leaving doesn't affect DB."""
         handler = registered_handlers["member_left_channel"]
-        event = {
-            "type": "member_left_channel",
-            "user": "U_OTHER_USER",  # Not the bot
-            "channel": "C123456",
-        }
 
-        await handler(event)
+        await handler(OTHER_USER_LEFT_EVENT)
 
-        mock_channel_repository.delete.assert_not_awaited()
+        assert channel_repository.deleted == []
 
     async def test_handler_logs_error_on_delete_failure(
         self,
-        mock_event_queue: AsyncMock,
-        mock_event_adapter: AsyncMock,
-        mock_message_repository: AsyncMock,
-        mock_channel_repository: AsyncMock,
-        bot_user_id: str,
+        registered_handlers: dict[str, Any],
+        channel_repository: FakeChannelRepository,
     ) -> None:
         """Test that errors during delete are logged but don't crash."""
-        # Need to create a fresh fixture with error-raising delete
-        handlers: dict[str, Any] = {}
-        mock_app = Mock()
-
-        def capture_event(event_type: str):
-            def decorator(func):
-                handlers[event_type] = func
-                return func
+        channel_repository.delete_error = Exception("DB error")
 
-            return decorator
-
-        mock_app.event = capture_event
-
-        # Make delete raise an exception
-        mock_channel_repository.delete.side_effect = Exception("DB error")
-
-        register_handlers(
-            mock_app,
-            mock_event_queue,
-            mock_event_adapter,
-            bot_user_id,
-            mock_message_repository,
-            mock_channel_repository,
-        )
-
-        handler = handlers["member_left_channel"]
-        event = {
-            "type": "member_left_channel",
-            "user": bot_user_id,
-            "channel": "C123456",
-        }
+        handler = registered_handlers["member_left_channel"]
 
         # Should not raise
-        await handler(event)
+        await handler(BOT_LEFT_EVENT)
 
-        mock_channel_repository.delete.assert_awaited_once_with("C123456")
+        assert channel_repository.deleted == ["C123456"]
 
 
 class TestMessageHandlerChannelFiltering:
@@ -168,87 +224,41 @@ class TestMessageHandlerChannelFiltering:
 
     async def test_message_from_unknown_channel_is_skipped(
         self,
-        mock_event_queue: AsyncMock,
-        mock_event_adapter: AsyncMock,
-        mock_message_repository: AsyncMock,
-        mock_channel_repository: AsyncMock,
-        bot_user_id: str,
+        registered_handlers: dict[str, Any],
+        event_adapter: FakeEventAdapter,
+        message_repository: FakeMessageRepository,
+        channel_repository: FakeChannelRepository,
         caplog: pytest.LogCaptureFixture,
     ) -> None:
         """Test that messages from unknown channels are skipped with warning."""
-        # Need fresh handlers with find_by_id returning None
-        handlers: dict[str, Any] = {}
-        mock_app = Mock()
-
-        def capture_event(event_type: str):
-            def decorator(func):
-                handlers[event_type] = func
-                return func
-
-            return decorator
-
-        mock_app.event = capture_event
-
-        # Channel not in DB
-        mock_channel_repository.find_by_id = AsyncMock(return_value=None)
-
-        register_handlers(
-            mock_app,
-            mock_event_queue,
-            mock_event_adapter,
-            bot_user_id,
-            mock_message_repository,
-            mock_channel_repository,
-        )
-
-        handler = handlers["message"]
-        event = {
-            "type": "message",
-            "ts": "1234567890.123456",
-            "channel": "C_UNKNOWN",
-            "text": f"Hello <@{bot_user_id}>",
-            "user": "U_USER",
-        }
+        caplog.set_level(logging.WARNING, logger="myao2.presentation.slack_handlers")
+        handler = registered_handlers["message"]
 
-        await handler(event)
+        await handler(UNKNOWN_CHANNEL_MENTION_EVENT)
 
         # Should not process the message
-        mock_event_adapter.to_message.assert_not_awaited()
-        mock_message_repository.save.assert_not_awaited()
+        assert event_adapter.converted == []
+        assert message_repository.saved == []
 
         # Should log warning about scope
-        assert "C_UNKNOWN" in caplog.text
-        assert "scope" in caplog.text.lower()
+        warning = next(
+            record
+            for record in caplog.records
+            if record.levelno == logging.WARNING and "C_UNKNOWN" in record.getMessage()
+        )
+        assert "scope" in warning.getMessage().lower()
 
     async def test_message_from_known_channel_is_processed(
         self,
-        mock_event_queue: AsyncMock,
-        mock_event_adapter: AsyncMock,
-        mock_message_repository: AsyncMock,
-        mock_channel_repository: AsyncMock,
-        bot_user_id: str,
+        registered_handlers: dict[str, Any],
+        event_adapter: FakeEventAdapter,
+        message_repository: FakeMessageRepository,
+        channel_repository: FakeChannelRepository,
     ) -> None:
         """Test that messages from known channels are processed normally."""
-        from datetime import datetime, timezone
-
-        from myao2.domain.entities.message import Channel, Message, User
-
-        # Need fresh handlers with find_by_id returning a channel
-        handlers: dict[str, Any] = {}
-        mock_app = Mock()
-
-        def capture_event(event_type: str):
-            def decorator(func):
-                handlers[event_type] = func
-                return func
-
-            return decorator
-
-        mock_app.event = capture_event
-
         # Channel exists in DB
         channel = Channel(id="C_KNOWN", name="general")
-        mock_channel_repository.find_by_id = AsyncMock(return_value=channel)
+        channel_repository.channel = channel
 
         # Setup message conversion
         user = User(id="U_USER", name="testuser", is_bot=False)
@@ -261,50 +271,30 @@ class TestMessageHandlerChannelFiltering:
             thread_ts=None,
             mentions=[],
         )
-        mock_event_adapter.to_message = AsyncMock(return_value=message)
-
-        register_handlers(
-            mock_app,
-            mock_event_queue,
-            mock_event_adapter,
-            bot_user_id,
-            mock_message_repository,
-            mock_channel_repository,
-        )
+        event_adapter.message = message
 
-        handler = handlers["message"]
-        event = {
-            "type": "message",
-            "ts": "1234567890.123456",
-            "channel": "C_KNOWN",
-            "text": "Hello",
-            "user": "U_USER",
-        }
+        handler = registered_handlers["message"]
 
-        await handler(event)
+        await handler(KNOWN_CHANNEL_MESSAGE_EVENT)
 
         # Should process the message
-        mock_channel_repository.find_by_id.assert_awaited_once_with("C_KNOWN")
-        mock_event_adapter.to_message.assert_awaited_once()
-        mock_message_repository.save.assert_awaited_once()
+        assert channel_repository.looked_up == ["C_KNOWN"]
+        assert event_adapter.converted == [KNOWN_CHANNEL_MESSAGE_EVENT]
+        assert message_repository.saved == [message]
 
     async def test_message_deleted_skips_channel_check(
         self,
         registered_handlers: dict[str, Any],
-        mock_channel_repository: AsyncMock,
-        mock_message_repository: AsyncMock,
+        channel_repository: FakeChannelRepository,
+        message_repository: FakeMessageRepository,
     ) -> None:
         """Test that message_deleted events skip channel membership check."""
         handler = registered_handlers["message"]
-        event = {
-            "type": "message",
-            "subtype": "message_deleted",
-            "deleted_ts": "1234567890.123456",
-            "channel": "C_ANY",
-        }
 
-        await handler(event)
+        await handler(MESSAGE_DELETED_EVENT)
 
         # Should process delete without channel check
-        mock_channel_repository.find_by_id.assert_not_awaited()
-        mock_message_repository.delete.assert_awaited_once()
+        assert channel_repository.looked_up == []
+        assert message_repository.deleted == [
+            {"message_id": "1234567890.123456", "channel_id": "C_ANY"}
+        ]